@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from results import result_store
+
+# Cohort analytics settings (override through environment variables)
+# Stored reports are pulled in at most this often; summaries are cached in between
+ANALYTICS_REFRESH_INTERVAL = float(os.getenv('ANALYTICS_REFRESH_INTERVAL', '30'))
+ANALYTICS_BATCH_SIZE = int(os.getenv('ANALYTICS_BATCH_SIZE', '1000'))
+ANALYTICS_TOP_SKILLS = int(os.getenv('ANALYTICS_TOP_SKILLS', '10'))
+
+SCORE_BINS = np.arange(0, 101, 10)
+TREND_PERIODS = {'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400}
+
+
+class GrowableArray:
+    """1-D NumPy array with amortised appends (capacity doubles as rows arrive)"""
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+
+class Vocabulary:
+    """Maps labels to dense integer ids; ids index the count arrays"""
+
+    def __init__(self):
+        self.index = {}
+        self.labels = []
+
+    def id_for(self, label):
+        key = label.strip().lower()
+        label_id = self.index.get(key)
+        if label_id is None:
+            label_id = self.index[key] = len(self.labels)
+            self.labels.append(label.strip())
+        return label_id
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class CohortAnalytics:
+    """Columnar view of stored reports for cohort aggregates.
+
+    One row per report: course id, score, tier id and timestamp in parallel
+    arrays, plus (row, skill id) pairs for current and missing skills.
+    Aggregates are bincounts and masks over those arrays, so they cost the
+    same whether a course has ten reports or a hundred thousand.
+    """
+
+    def __init__(self, store, refresh_interval=ANALYTICS_REFRESH_INTERVAL, batch_size=ANALYTICS_BATCH_SIZE):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.courses = Vocabulary()
+        self.tiers = Vocabulary()
+        self.skills = Vocabulary()
+        self.course_ids = GrowableArray(np.int32)
+        self.tier_ids = GrowableArray(np.int32)
+        self.scores = GrowableArray(np.float64)
+        self.created_at = GrowableArray(np.float64)
+        self.missing_rows = GrowableArray(np.int32)
+        self.missing_skills = GrowableArray(np.int32)
+        self.current_rows = GrowableArray(np.int32)
+        self.current_skills = GrowableArray(np.int32)
+        self.position = 0
+        self.version = 0
+        self._refreshed_at = 0.0
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self):
+        return self.course_ids.size
+
+    def refresh(self, force=False):
+        """Append reports stored since the last refresh, one batch of columns at a time"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+            for batch in self.store.iter_since(self.position, self.batch_size):
+                self._append(batch)
+                self.position = batch[-1][0]
+                self.version += 1
+                self._summaries = {}
+
+    def _append(self, batch):
+        first_row = self.rows
+        course_ids, tier_ids, scores, created_at = [], [], [], []
+        missing_rows, missing_skills, current_rows, current_skills = [], [], [], []
+        for offset, (_, course, score, assessment_type, created, report) in enumerate(batch):
+            row = first_row + offset
+            course_ids.append(self.courses.id_for(course))
+            tier_ids.append(self.tiers.id_for(assessment_type or 'unknown'))
+            scores.append(np.nan if score is None else score)
+            created_at.append(created)
+            skills_analysis = report.get('skillsAnalysis') or {}
+            for skill in _skill_list(skills_analysis.get('missingSkills')):
+                missing_rows.append(row)
+                missing_skills.append(self.skills.id_for(skill))
+            for skill in _skill_list(skills_analysis.get('currentSkills')):
+                current_rows.append(row)
+                current_skills.append(self.skills.id_for(skill))
+        self.course_ids.extend(course_ids)
+        self.tier_ids.extend(tier_ids)
+        self.scores.extend(scores)
+        self.created_at.extend(created_at)
+        self.missing_rows.extend(missing_rows)
+        self.missing_skills.extend(missing_skills)
+        self.current_rows.extend(current_rows)
+        self.current_skills.extend(current_skills)
+
+    def summary(self, course=None, top=ANALYTICS_TOP_SKILLS, period='week'):
+        """Aggregates for one course (or every course), cached until new reports arrive"""
+        if period not in TREND_PERIODS:
+            raise ValueError(f"period must be one of {', '.join(TREND_PERIODS)}")
+        self.refresh()
+        key = (course, top, period)
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                return cached
+            summary = self._compute(course, top, period)
+            self._summaries[key] = summary
+            return summary
+
+    def _compute(self, course, top, period):
+        course_ids = self.course_ids.values
+        if course is None:
+            row_mask = np.ones(self.rows, dtype=bool)
+        else:
+            course_id = self.courses.index.get(course.strip().lower())
+            row_mask = course_ids == course_id if course_id is not None else np.zeros(self.rows, dtype=bool)
+
+        scores = self.scores.values[row_mask]
+        scored = scores[~np.isnan(scores)]
+        report_count = int(row_mask.sum())
+        summary = {
+            'course': course,
+            'reports': report_count,
+            'scoredReports': int(scored.size),
+            'scores': _score_stats(scored),
+            'tiers': _label_counts(self.tiers, self.tier_ids.values[row_mask]),
+            'topMissingSkills': self._top_skills(self.missing_rows.values, self.missing_skills.values, row_mask, report_count, top),
+            'topCurrentSkills': self._top_skills(self.current_rows.values, self.current_skills.values, row_mask, report_count, top),
+            'trend': self._trend(row_mask, TREND_PERIODS[period]),
+            'period': period,
+            'version': self.version,
+        }
+        if course is None:
+            summary['courses'] = self._per_course()
+        return summary
+
+    def _top_skills(self, rows, skill_ids, row_mask, report_count, top):
+        if not report_count or not skill_ids.size:
+            return []
+        counts = np.bincount(skill_ids[row_mask[rows]], minlength=len(self.skills))
+        top = min(top, int(np.count_nonzero(counts)))
+        if top <= 0:
+            return []
+        best = np.argpartition(-counts, top - 1)[:top]
+        best = best[np.argsort(-counts[best], kind='stable')]
+        return [{'skill': self.skills.labels[skill_id], 'count': int(counts[skill_id]),
+                 'share': round(float(counts[skill_id]) / report_count, 4)} for skill_id in best]
+
+    def _trend(self, row_mask, period_seconds):
+        created = self.created_at.values[row_mask]
+        if not created.size:
+            return []
+        scores = self.scores.values[row_mask]
+        buckets, inverse = np.unique(np.floor(created / period_seconds).astype(np.int64), return_inverse=True)
+        counts = np.bincount(inverse, minlength=buckets.size)
+        scored = ~np.isnan(scores)
+        score_sums = np.bincount(inverse[scored], weights=scores[scored], minlength=buckets.size)
+        score_counts = np.bincount(inverse[scored], minlength=buckets.size)
+        return [{
+            'periodStart': datetime.fromtimestamp(int(bucket) * period_seconds).isoformat(),
+            'reports': int(count),
+            'meanScore': round(float(score_sum / score_count), 2) if score_count else None,
+        } for bucket, count, score_sum, score_count in zip(buckets, counts, score_sums, score_counts)]
+
+    def _per_course(self):
+        course_ids = self.course_ids.values
+        scores = self.scores.values
+        scored = ~np.isnan(scores)
+        counts = np.bincount(course_ids, minlength=len(self.courses))
+        score_sums = np.bincount(course_ids[scored], weights=scores[scored], minlength=len(self.courses))
+        score_counts = np.bincount(course_ids[scored], minlength=len(self.courses))
+        return [{
+            'course': label,
+            'reports': int(counts[course_id]),
+            'meanScore': round(float(score_sums[course_id] / score_counts[course_id]), 2) if score_counts[course_id] else None,
+        } for course_id, label in sorted(enumerate(self.courses.labels), key=lambda item: -counts[item[0]])]
+
+
+def _skill_list(value):
+    if not isinstance(value, list):
+        return []
+    return [skill for skill in value if isinstance(skill, str) and skill.strip()]
+
+
+def _score_stats(scored):
+    if not scored.size:
+        return {'mean': None, 'median': None, 'p25': None, 'p75': None, 'histogram': []}
+    p25, median, p75 = np.percentile(scored, [25, 50, 75])
+    histogram, _ = np.histogram(np.clip(scored, 0, 100), bins=SCORE_BINS)
+    return {
+        'mean': round(float(scored.mean()), 2),
+        'median': round(float(median), 2),
+        'p25': round(float(p25), 2),
+        'p75': round(float(p75), 2),
+        'histogram': [{'from': int(low), 'to': int(high), 'reports': int(count)}
+                      for low, high, count in zip(SCORE_BINS[:-1], SCORE_BINS[1:], histogram)],
+    }
+
+
+def _label_counts(vocabulary, ids):
+    counts = np.bincount(ids, minlength=len(vocabulary))
+    return {vocabulary.labels[label_id]: int(count) for label_id, count in enumerate(counts) if count}
+
+
+cohort_analytics = CohortAnalytics(result_store)
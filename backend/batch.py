@@ -0,0 +1,200 @@
+"""Batch assessment of completed conversations (cohort processing).
+
+Input is JSONL, one record per line:
+
+    {"id": "student-17", "course": "Computer Science", "conversationHistory": [{"type": "user", "content": "..."}, ...]}
+
+Output is JSONL in completion order, one result per record:
+
+    {"id": "student-17", "status": "completed", "inputHash": "...", "assessment": {...}}
+    {"id": "student-18", "status": "failed", "inputHash": "...", "error": "..."}
+
+inputHash covers the record's course and conversation, so a resumed run only
+reuses a result when the record it came from is unchanged.
+
+Run offline from the backend directory (re-running the same command resumes):
+
+    python batch.py cohort.jsonl results.jsonl --concurrency 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from log_config import run_with_context
+
+# Batch settings (override through environment variables)
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '16'))
+BATCH_MAX_RECORDS = int(os.getenv('BATCH_MAX_RECORDS', '500'))
+# Results of API batches, kept under their server-issued batchId so an interrupted batch can resume
+BATCH_DIR = os.getenv('BATCH_DIR', os.path.join(tempfile.gettempdir(), 'skillbridge_batches'))
+
+BATCH_COMPLETED = 'completed'
+BATCH_FAILED = 'failed'
+
+_BATCH_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def read_records(lines):
+    """Parse JSONL lines into (record_id, record) pairs; records without an id use their line number"""
+    seen = set()
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Line {line_number} is not valid JSON: {e.msg}')
+        if not isinstance(record, dict):
+            raise ValueError(f'Line {line_number} must be a JSON object')
+        record_id = str(record.get('id') or line_number)
+        if record_id in seen:
+            raise ValueError(f"Line {line_number} repeats id '{record_id}'")
+        seen.add(record_id)
+        yield record_id, record
+
+
+def record_inputs(record):
+    return (record.get('course') or '').strip(), record.get('conversationHistory') or record.get('conversation')
+
+
+def record_digest(record):
+    """Hash of the inputs a record's report is built from"""
+    canonical = json.dumps(record_inputs(record), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def reusable_results(path, records):
+    """Completed result lines in a results file whose id and inputHash match a record, by id.
+
+    A line torn by a crash is ignored, and so is a result for a record that
+    has since been edited (or one written before inputHash was recorded).
+    """
+    reusable = {}
+    if not os.path.exists(path):
+        return reusable
+    digests = {record_id: record_digest(record) for record_id, record in records}
+    with open(path, encoding='utf-8') as results_file:
+        for line in results_file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(result, dict) or result.get('status') != BATCH_COMPLETED:
+                continue
+            record_id = str(result.get('id'))
+            if record_id in digests and result.get('inputHash') == digests[record_id]:
+                reusable[record_id] = line.rstrip('\n')
+    return reusable
+
+
+def assess_record(generate, record, store=None):
+    """Run generate(course, conversation_history) for one input record, saving the report to store if given"""
+    course, conversation_history = record_inputs(record)
+    if not course or not isinstance(conversation_history, list) or not conversation_history:
+        raise ValueError('Record needs a course and a non-empty conversationHistory')
+    assessment = generate(course, conversation_history)
+    # The input already carries the conversation, so it is not echoed into every result line
+    result = {key: value for key, value in assessment.items() if key != 'conversation'}
+    if store is not None:
+        # Stored with its conversation like chat reports, so cohorts show up in listings, analytics and reuse
+        result['assessmentId'] = store.save(None, course, dict(assessment, conversation=conversation_history))
+    return result
+
+
+def run_batch(records, generate, concurrency=BATCH_CONCURRENCY, skip=frozenset(), store=None):
+    """Assess (record_id, record) pairs with at most `concurrency` in flight.
+
+    Yields one result dict per record as it finishes. Records whose id is in
+    skip are not run. Reports are also saved to store (a result store) when
+    given. Stopping the generator cancels records not yet started.
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch')
+    pending = {}
+
+    def finished(timeout=None):
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            record_id, digest = pending.pop(future)
+            try:
+                yield {'id': record_id, 'status': BATCH_COMPLETED, 'inputHash': digest, 'assessment': future.result()}
+            except Exception as e:
+                yield {'id': record_id, 'status': BATCH_FAILED, 'inputHash': digest, 'error': str(e)}
+
+    try:
+        for record_id, record in records:
+            if record_id in skip:
+                continue
+            while len(pending) >= concurrency:
+                yield from finished()
+            pending[executor.submit(run_with_context(assess_record), generate, record, store)] = (record_id, record_digest(record))
+        while pending:
+            yield from finished()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def new_batch_id():
+    """Unguessable ID for a new API batch; clients only ever resume IDs the server handed out"""
+    return uuid.uuid4().hex
+
+
+def batch_results_path(batch_id):
+    """Results file for an API batch, or ValueError for an id the server did not issue"""
+    if not _BATCH_ID.match(batch_id):
+        raise ValueError('Unknown batchId')
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    return os.path.join(BATCH_DIR, f'{batch_id}.jsonl')
+
+
+def write_result(results_file, result):
+    """Append one result line and make it durable before the record counts as done"""
+    results_file.write(json.dumps(result) + '\n')
+    results_file.flush()
+    os.fsync(results_file.fileno())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Assess a JSONL file of completed conversations')
+    parser.add_argument('input', help='JSONL file of {"id", "course", "conversationHistory"} records')
+    parser.add_argument('output', help='JSONL results file (appended to, so re-running resumes)')
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument('--restart', action='store_true', help='ignore earlier results and start over')
+    args = parser.parse_args()
+
+    # Imported here so the app (and its worker pools) is only loaded for a real run
+    from app import generate_batch_assessment
+    from results import result_store
+
+    with open(args.input, encoding='utf-8') as input_file:
+        records = list(read_records(input_file))
+    skip = set() if args.restart else set(reusable_results(args.output, records))
+
+    counts = {BATCH_COMPLETED: 0, BATCH_FAILED: 0}
+    started = time.perf_counter()
+    with open(args.output, 'w' if args.restart else 'a', encoding='utf-8') as results_file:
+        for result in run_batch(records, generate_batch_assessment, max(1, args.concurrency), skip, result_store):
+            write_result(results_file, result)
+            counts[result['status']] += 1
+    elapsed = time.perf_counter() - started
+
+    processed = counts[BATCH_COMPLETED] + counts[BATCH_FAILED]
+    print(
+        f"{processed} records in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.2f}/s): "
+        f"{counts[BATCH_COMPLETED]} completed, {counts[BATCH_FAILED]} failed, "
+        f"{len(skip)} skipped as already completed",
+        file=sys.stderr
+    )
+    return 1 if counts[BATCH_FAILED] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Compare cohort aggregates computed by looping over report dicts with the columnar analytics.
+
+Fills a temporary result store with synthetic reports, then times a
+per-request Python loop over every report (load + aggregate) against
+CohortAnalytics (one incremental load, then summaries from arrays).
+Run from the backend directory:
+
+    python bench/analytics.py --reports 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import CohortAnalytics  # noqa: E402
+from results import SQLiteResultStore  # noqa: E402
+
+COURSES = ['Computer Science', 'Economics', 'Mechanical Engineering', 'Law', 'Accounting']
+SKILLS = ['Version Control', 'Cloud Deployment', 'Automated Testing', 'Financial Modeling', 'Excel',
+          'Public Speaking', 'CAD Software', 'Legal Research', 'Data Analysis', 'Project Management',
+          'SQL', 'Python', 'Technical Writing', 'Networking', 'Negotiation']
+
+
+def fill_store(store, count, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        store.save(None, rng.choice(COURSES), {
+            'assessmentType': rng.choice(['ai_generated', 'ai_generated', 'ai_simplified', 'conversation_aware_fallback']),
+            'employabilityScore': rng.randint(35, 95),
+            'skillsAnalysis': {
+                'currentSkills': rng.sample(SKILLS, 4),
+                'missingSkills': rng.sample(SKILLS, 4),
+            },
+        })
+
+
+def loop_summary(store, course):
+    """What an endpoint would do without the columnar view: walk every stored report"""
+    scores, missing = [], Counter()
+    reports = 0
+    for batch in store.iter_since(0, 1000):
+        for _, report_course, score, _, _, report in batch:
+            if report_course != course:
+                continue
+            reports += 1
+            if score is not None:
+                scores.append(score)
+            missing.update(report.get('skillsAnalysis', {}).get('missingSkills', []))
+    scores.sort()
+    return {
+        'reports': reports,
+        'mean': sum(scores) / len(scores) if scores else None,
+        'median': scores[len(scores) // 2] if scores else None,
+        'topMissingSkills': missing.most_common(10),
+    }
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteResultStore(os.path.join(directory, 'results.db'))
+        fill_store(store, args.reports)
+        course = COURSES[0]
+
+        loop_time = timed(lambda: loop_summary(store, course), args.repeat)
+
+        analytics = CohortAnalytics(store, refresh_interval=float('inf'))
+        load_time = timed(lambda: analytics.refresh(force=True), 1)
+
+        def uncached_summary():
+            analytics._summaries = {}
+            analytics.summary(course)
+        summary_time = timed(uncached_summary, args.repeat)
+        cached_time = timed(lambda: analytics.summary(course), args.repeat * 100)
+
+        fill_store(store, args.reports // 100, seed=11)
+        incremental_time = timed(lambda: analytics.refresh(force=True), 1)
+
+    print(f"{args.reports} stored reports, course '{course}'")
+    print(f"{'python loop per request':<36} {loop_time * 1000:>10.1f} ms")
+    print(f"{'columnar initial load (once)':<36} {load_time * 1000:>10.1f} ms")
+    print(f"{'columnar summary (uncached)':<36} {summary_time * 1000:>10.2f} ms")
+    print(f"{'columnar summary (cached)':<36} {cached_time * 1000:>10.4f} ms")
+    print(f"{f'incremental load of {args.reports // 100} new reports':<36} {incremental_time * 1000:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
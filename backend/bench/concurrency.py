@@ -0,0 +1,128 @@
+"""Compare sync and gevent gunicorn workers under concurrent chat load.
+
+Starts the mock upstream, then for each worker class boots the API with a
+single gunicorn worker and fires CONCURRENCY simultaneous /api/chat-assess
+requests. Run from the backend directory:
+
+    python bench/concurrency.py --concurrency 200 --latency 1.0
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHAT_PAYLOAD = {
+    'course': 'Computer Science',
+    'userMessage': 'I studied computer science and built a web app for my final year project.',
+    'conversationHistory': [],
+    'assessmentPhase': 'introduction',
+    'userProfile': {}
+}
+
+
+def wait_for(url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def post_chat(url):
+    started = time.perf_counter()
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(CHAT_PAYLOAD).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def run_load(api_port, concurrency):
+    url = f'http://127.0.0.1:{api_port}/api/chat-assess'
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: post_chat(url), range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for ok, latency in results if ok)
+    return {
+        'ok': len(latencies),
+        'failed': concurrency - len(latencies),
+        'wall': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': latencies[len(latencies) // 2] if latencies else None,
+        'max': latencies[-1] if latencies else None,
+    }
+
+
+def boot_api(worker_class, api_port, upstream_port, concurrency, rate_limit=False):
+    env = dict(
+        os.environ,
+        PORT=str(api_port),
+        KIMI_API_KEY=os.getenv('KIMI_API_KEY', 'bench-key-000000000000000000'),
+        KIMI_API_BASE=f'http://127.0.0.1:{upstream_port}',
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS='1',
+        GUNICORN_WORKER_CONNECTIONS=str(max(1000, concurrency)),
+    )
+    if not rate_limit:
+        # The shared limiter would cap the run at UPSTREAM_RATE_MAX calls/s and measure that instead
+        env['UPSTREAM_RATE_LIMIT_ENABLED'] = 'false'
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=1.0)
+    parser.add_argument('--api-port', type=int, default=8801)
+    parser.add_argument('--upstream-port', type=int, default=8765)
+    parser.add_argument('--workers', nargs='+', default=['sync', 'gevent'])
+    parser.add_argument('--rate-limit', action='store_true', help='keep the upstream rate limiter on')
+    args = parser.parse_args()
+
+    upstream = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'bench', 'mock_upstream.py'),
+         '--port', str(args.upstream_port), '--latency', str(args.latency)],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        print(f"{args.concurrency} concurrent chat turns, upstream latency {args.latency}s, 1 worker process")
+        print(f"{'worker':<8} {'ok':>5} {'failed':>7} {'wall (s)':>9} {'req/s':>8} {'p50 (s)':>8} {'max (s)':>8}")
+        for worker_class in args.workers:
+            api = boot_api(worker_class, args.api_port, args.upstream_port, args.concurrency, args.rate_limit)
+            try:
+                wait_for(f'http://127.0.0.1:{args.api_port}/api/health')
+                result = run_load(args.api_port, args.concurrency)
+            finally:
+                api.terminate()
+                api.wait()
+            p50 = f"{result['p50']:.2f}" if result['p50'] is not None else '-'
+            worst = f"{result['max']:.2f}" if result['max'] is not None else '-'
+            print(f"{worker_class:<8} {result['ok']:>5} {result['failed']:>7} {result['wall']:>9.2f} "
+                  f"{result['throughput']:>8.1f} {p50:>8} {worst:>8}")
+    finally:
+        upstream.terminate()
+        upstream.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""Load-test full assessments against the mock upstream and compare with a baseline.
+
+Starts the mock upstream and the API under gunicorn, then runs scripted
+conversations through /api/chat-assess (or the streaming endpoint) until
+each one reaches the comprehensive report. Reports throughput, p50/p95/p99
+latency for chat turns and report turns, and upstream calls per completed
+assessment. Run from the backend directory:
+
+    python bench/loadtest.py --conversations 50 --concurrency 25 --latency 0.5 --save-baseline bench/baseline.json
+    python bench/loadtest.py --conversations 50 --concurrency 25 --latency 0.5 --baseline bench/baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_upstream import add_behaviour_arguments, behaviour_arguments
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One answer per chat turn; the API reaches the report on the sixth turn
+CONVERSATION_SCRIPT = [
+    "Hi, I graduated in computer science last year and I'm looking for my first developer job.",
+    "For my final year project I built a library management system with Django and PostgreSQL.",
+    "I also did a six month internship where I worked on REST APIs and fixed bugs in a React frontend.",
+    "My strongest skills are Python and SQL. I'm less confident with testing and cloud deployment.",
+    "The main challenge has been getting interviews, most roles ask for two years of experience.",
+    "In five years I want to be a backend engineer working on systems that serve a lot of users.",
+    "I can spend about ten hours a week on learning, mostly in the evenings.",
+    "I would prefer free resources because paid courses are expensive for me right now.",
+]
+
+# Results where a higher number is better; every other metric is better lower
+HIGHER_IS_BETTER = {'assessmentsPerSecond', 'requestsPerSecond', 'completed'}
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def post_json(url, payload, timeout=300):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get_content_type() == 'text/event-stream':
+            return read_done_event(body.decode('utf-8'))
+        return json.loads(body)
+
+
+def read_done_event(stream_text):
+    """The payload of the final ``done`` event of an SSE response"""
+    for message in stream_text.split('\n\n'):
+        lines = message.split('\n')
+        if lines and lines[0] == 'event: done':
+            return json.loads(lines[1][len('data: '):])
+        if lines and lines[0] == 'event: error':
+            raise RuntimeError(lines[1])
+    raise RuntimeError('stream ended without a done event')
+
+
+def run_conversation(api_url, index, stream, max_turns):
+    """Drive one scripted conversation to its report; returns per-turn timings and the outcome"""
+    url = f"{api_url}/api/chat-assess{'/stream' if stream else ''}"
+    turns = []
+    session_id = None
+    for turn in range(max_turns):
+        # Vary the answers per conversation so the report cache does not short-circuit the run
+        message = f"{CONVERSATION_SCRIPT[turn % len(CONVERSATION_SCRIPT)]} (graduate {index})"
+        payload = {'userMessage': message}
+        if session_id:
+            payload['sessionId'] = session_id
+        else:
+            payload.update({'course': 'Computer Science', 'conversationHistory': [],
+                            'assessmentPhase': 'introduction', 'userProfile': {}})
+        started = time.perf_counter()
+        try:
+            response = post_json(url, payload)
+        except (urllib.error.URLError, RuntimeError, ValueError) as e:
+            turns.append({'kind': 'chat', 'seconds': time.perf_counter() - started, 'ok': False})
+            return {'turns': turns, 'completed': False, 'error': str(e)}
+        elapsed = time.perf_counter() - started
+        session_id = response.get('sessionId')
+        is_report = 'assessment' in response
+        turns.append({'kind': 'report' if is_report else 'chat', 'seconds': elapsed, 'ok': True})
+        if is_report:
+            return {'turns': turns, 'completed': True, 'assessmentType': response['assessment'].get('assessmentType')}
+    return {'turns': turns, 'completed': False, 'error': f'no report after {max_turns} turns'}
+
+
+def summarize(outcomes, wall, upstream_stats):
+    chat = [turn['seconds'] for outcome in outcomes for turn in outcome['turns'] if turn['ok'] and turn['kind'] == 'chat']
+    report = [turn['seconds'] for outcome in outcomes for turn in outcome['turns'] if turn['ok'] and turn['kind'] == 'report']
+    requests_made = sum(len(outcome['turns']) for outcome in outcomes)
+    completed = sum(1 for outcome in outcomes if outcome['completed'])
+    tiers = {}
+    for outcome in outcomes:
+        if outcome['completed']:
+            tiers[outcome['assessmentType']] = tiers.get(outcome['assessmentType'], 0) + 1
+    upstream_calls = upstream_stats.get('requests', 0)
+    return {
+        'conversations': len(outcomes),
+        'completed': completed,
+        'failedRequests': sum(1 for outcome in outcomes for turn in outcome['turns'] if not turn['ok']),
+        'wallSeconds': round(wall, 3),
+        'assessmentsPerSecond': round(completed / wall, 3) if wall else 0.0,
+        'requestsPerSecond': round(requests_made / wall, 3) if wall else 0.0,
+        'chatP50': percentile(chat, 50),
+        'chatP95': percentile(chat, 95),
+        'chatP99': percentile(chat, 99),
+        'reportP50': percentile(report, 50),
+        'reportP95': percentile(report, 95),
+        'reportP99': percentile(report, 99),
+        'upstreamCallsPerAssessment': round(upstream_calls / completed, 2) if completed else None,
+        'reportTiers': tiers,
+        'upstream': upstream_stats,
+    }
+
+
+def compare(result, baseline, tolerance):
+    """Print each numeric metric against the baseline; returns the names that regressed"""
+    regressions = []
+    print(f"\n{'metric':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in result.items():
+        previous = baseline.get(name)
+        if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)) or previous == 0:
+            continue
+        change = (current - previous) / previous
+        worse = change < -tolerance if name in HIGHER_IS_BETTER else change > tolerance
+        if worse:
+            regressions.append(name)
+        print(f"{name:<28} {previous:>10.3f} {current:>10.3f} {change:>+7.1%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def fetch_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def boot_api(args, state_dir):
+    env = dict(
+        os.environ,
+        PORT=str(args.api_port),
+        KIMI_API_KEY=os.getenv('KIMI_API_KEY', 'bench-key-000000000000000000'),
+        KIMI_API_BASE=f'http://127.0.0.1:{args.upstream_port}',
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_WORKER_CONNECTIONS=str(max(1000, args.concurrency)),
+        LOG_LEVEL=os.getenv('LOG_LEVEL', 'WARNING'),
+        # Fresh state for every run so earlier runs cannot warm caches or sessions
+        SESSION_DB=os.path.join(state_dir, 'sessions.db'),
+        REPORT_JOB_DB=os.path.join(state_dir, 'jobs.db'),
+        UPSTREAM_RATE_LIMIT_DB=os.path.join(state_dir, 'ratelimit.db'),
+        METRICS_DIR=os.path.join(state_dir, 'metrics'),
+        BATCH_DIR=os.path.join(state_dir, 'batches'),
+        RESULT_DB=os.path.join(state_dir, 'results.db'),
+    )
+    if not args.rate_limit:
+        env['UPSTREAM_RATE_LIMIT_ENABLED'] = 'false'
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--conversations', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=25)
+    parser.add_argument('--max-turns', type=int, default=12)
+    parser.add_argument('--stream', action='store_true', help='drive /api/chat-assess/stream instead')
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--rate-limit', action='store_true', help='keep the upstream rate limiter on')
+    parser.add_argument('--api-port', type=int, default=8801)
+    parser.add_argument('--upstream-port', type=int, default=8765)
+    parser.add_argument('--output', help='write the results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--save-baseline', help='write the results JSON here as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed relative change before a regression')
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+
+    upstream = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'bench', 'mock_upstream.py'),
+         '--port', str(args.upstream_port)] + behaviour_arguments(args),
+        stdout=subprocess.DEVNULL
+    )
+    upstream_url = f'http://127.0.0.1:{args.upstream_port}'
+    api_url = f'http://127.0.0.1:{args.api_port}'
+    with tempfile.TemporaryDirectory(prefix='skillbridge-bench-') as state_dir:
+        api = boot_api(args, state_dir)
+        try:
+            wait_for(f'{upstream_url}/stats')
+            wait_for(f'{api_url}/api/health')
+            fetch_json(f'{upstream_url}/stats?reset=1')
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                outcomes = list(pool.map(
+                    lambda index: run_conversation(api_url, index, args.stream, args.max_turns),
+                    range(args.conversations)
+                ))
+            wall = time.perf_counter() - started
+            result = summarize(outcomes, wall, fetch_json(f'{upstream_url}/stats'))
+        finally:
+            api.terminate()
+            api.wait()
+            upstream.terminate()
+            upstream.wait()
+
+    result['settings'] = {key: value for key, value in vars(args).items()
+                          if key not in ('output', 'baseline', 'save_baseline', 'api_port', 'upstream_port')}
+    print(json.dumps({key: value for key, value in result.items() if key != 'settings'}, indent=2))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as result_file:
+                json.dump(result, result_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""Mock OpenRouter chat-completions server for offline benchmarks.
+
+Run with:  python bench/mock_upstream.py --port 8765 --latency 1.0
+then point the API at it with KIMI_API_BASE=http://127.0.0.1:8765
+
+Latency can follow a distribution (--latency-dist lognormal --latency-jitter 0.5),
+and a share of calls can fail (--error-rate), be throttled with a 429
+(--throttle-rate) or return a broken report (--malformed-rate). Report prompts
+get a valid report JSON otherwise. GET /stats returns request counters
+(add ?reset=1 to zero them).
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MOCK_REPLY = 'Thanks for sharing! Could you tell me more about a project you worked on?'
+
+MOCK_REPORT = {
+    'skillsAnalysis': {
+        'currentSkills': ['Python', 'Django', 'REST APIs'],
+        'missingSkills': ['Cloud Deployment', 'Automated Testing'],
+        'strengthAreas': ['Backend Development', 'Problem Solving'],
+        'improvementAreas': ['System Design', 'Testing'],
+        'recommendedPath': ['Learn pytest', 'Deploy a project to the cloud', 'Study system design basics']
+    },
+    'personalizedPlan': {
+        'shortTerm': ['Add tests to the final year project'],
+        'mediumTerm': ['Contribute to an open-source Django project'],
+        'longTerm': ['Apply for backend developer roles'],
+        'resources': [{
+            'title': 'Django for Professionals',
+            'description': 'Production Django practices',
+            'url': 'https://example.com',
+            'provider': 'Example',
+            'duration': '4 weeks'
+        }],
+        'projects': [{
+            'title': 'Job board API',
+            'description': 'A REST API with authentication and tests',
+            'skills': ['Django', 'pytest'],
+            'difficulty': 'intermediate'
+        }]
+    },
+    'employabilityScore': 72,
+    'confidence': 80
+}
+
+
+class MockBehaviour:
+    """Latency and failure settings shared by every handler thread"""
+
+    def __init__(self, latency=1.0, latency_dist='constant', latency_jitter=0.5,
+                 error_rate=0.0, throttle_rate=0.0, malformed_rate=0.0, seed=None):
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.malformed_rate = malformed_rate
+        self.random = random.Random(seed)
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stats(self, reset=False):
+        with self._lock:
+            counts = dict(self.counts)
+            if reset:
+                self.counts = {}
+        return counts
+
+    def chance(self, rate):
+        with self._lock:
+            return self.random.random() < rate
+
+    def delay(self):
+        """One latency sample; the mean stays at self.latency for every distribution"""
+        with self._lock:
+            if self.latency_dist == 'uniform':
+                spread = self.latency * self.latency_jitter
+                return self.random.uniform(max(0.0, self.latency - spread), self.latency + spread)
+            if self.latency_dist == 'exponential':
+                return self.random.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+            if self.latency_dist == 'lognormal' and self.latency > 0:
+                sigma = self.latency_jitter
+                return self.random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+            return self.latency
+
+    def malformed_report(self):
+        """A report the API has to repair, or cannot use at all"""
+        report = json.dumps(MOCK_REPORT)
+        with self._lock:
+            kind = self.random.choice(['truncated', 'fenced', 'prose', 'garbage'])
+            cut = self.random.randint(len(report) // 3, len(report) - 2)
+        if kind == 'truncated':
+            return report[:cut]
+        if kind == 'fenced':
+            return f"Here is the assessment:\n```json\n{report}\n```"
+        if kind == 'prose':
+            return f"Based on the conversation, the graduate is doing well. {report} Let me know if you need more."
+        return 'I am sorry, I cannot produce JSON for this conversation.'
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    behaviour = MockBehaviour()
+
+    def do_GET(self):
+        if not self.path.startswith('/stats'):
+            self.send_json(404, {'error': 'not found'})
+            return
+        self.send_json(200, self.behaviour.stats(reset='reset=1' in self.path))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request_body = json.loads(self.rfile.read(length) or b'{}')
+        behaviour = self.behaviour
+        behaviour.count('requests')
+        time.sleep(behaviour.delay())
+
+        if behaviour.chance(behaviour.throttle_rate):
+            behaviour.count('throttled')
+            self.send_json(429, {'error': {'message': 'Rate limit exceeded'}}, {'Retry-After': '1'})
+            return
+        if behaviour.chance(behaviour.error_rate):
+            behaviour.count('errors')
+            self.send_json(502, {'error': {'message': 'Upstream provider error'}})
+            return
+
+        content = MOCK_REPLY
+        prompt = ''.join(message.get('content', '') for message in request_body.get('messages', []))
+        if request_body.get('response_format') or 'skillsAnalysis' in prompt:
+            behaviour.count('reports')
+            if behaviour.chance(behaviour.malformed_rate):
+                behaviour.count('malformed')
+                content = behaviour.malformed_report()
+            else:
+                content = json.dumps(MOCK_REPORT)
+
+        if request_body.get('stream'):
+            behaviour.count('streams')
+            self.send_stream(content)
+            return
+
+        self.send_json(200, {
+            'id': 'mock-completion',
+            'choices': [{
+                'index': 0,
+                'message': {
+                    'role': 'assistant',
+                    'content': content
+                },
+                'finish_reason': 'stop'
+            }]
+        })
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, content):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        self.write_chunk(': OPENROUTER PROCESSING\n\n')
+        for word in content.split(' '):
+            chunk = {'choices': [{'index': 0, 'delta': {'content': word + ' '}}]}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self.write_chunk('data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve(port, behaviour):
+    MockUpstreamHandler.behaviour = behaviour
+    server = MockUpstreamServer(('127.0.0.1', port), MockUpstreamHandler)
+    print(f"Mock upstream listening on http://127.0.0.1:{port} "
+          f"(latency {behaviour.latency}s {behaviour.latency_dist})", flush=True)
+    server.serve_forever()
+
+
+def add_behaviour_arguments(parser):
+    """Mock upstream options, shared with the benchmarks that start this server"""
+    parser.add_argument('--latency', type=float, default=1.0, help='mean seconds to wait before answering')
+    parser.add_argument('--latency-dist', choices=['constant', 'uniform', 'exponential', 'lognormal'], default='constant')
+    parser.add_argument('--latency-jitter', type=float, default=0.5,
+                        help='uniform: spread as a fraction of the mean; lognormal: sigma')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of calls answered with a 502')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of calls answered with a 429')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='share of report calls with broken JSON')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def behaviour_arguments(args):
+    """Command-line flags that reproduce the parsed behaviour options"""
+    return [
+        '--latency', str(args.latency), '--latency-dist', args.latency_dist,
+        '--latency-jitter', str(args.latency_jitter), '--error-rate', str(args.error_rate),
+        '--throttle-rate', str(args.throttle_rate), '--malformed-rate', str(args.malformed_rate),
+    ] + (['--seed', str(args.seed)] if args.seed is not None else [])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args()
+    serve(args.port, MockBehaviour(
+        args.latency, args.latency_dist, args.latency_jitter,
+        args.error_rate, args.throttle_rate, args.malformed_rate, args.seed
+    ))
@@ -0,0 +1,83 @@
+"""Measure report payload bytes and serialization CPU per report.
+
+Builds reports the way the API returns them (a fallback report plus the
+echoed conversation) and prints, for each conversation mode, the body size
+under identity, gzip and brotli along with the CPU time to encode it with
+json.dumps and orjson and to compress it. Run from the backend directory:
+
+    python bench/payloads.py --messages 24 --reports 500
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import brotli  # noqa: E402
+import orjson  # noqa: E402
+
+from app import generate_conversation_based_fallback  # noqa: E402
+from responses import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL, shape_report  # noqa: E402
+
+COURSE = 'Computer Science'
+USER_LINES = [
+    'During my internship I built a REST API in Python with Flask and PostgreSQL.',
+    'I wrote unit tests with pytest and set up a CI pipeline on GitHub Actions.',
+    'My final year project was a React dashboard that showed sensor data in real time.',
+    'I am comfortable with Git, Docker and basic Linux administration.',
+    'I want to become a backend engineer but I have not used cloud platforms much yet.',
+    'In a team project I coordinated the sprint planning and reviewed pull requests.',
+]
+AI_LINES = [
+    'That sounds like solid hands-on experience. What was the hardest part of that project?',
+    'Great. How did you decide on the architecture, and what would you change today?',
+    'Interesting! Could you tell me more about how you worked with your team on it?',
+]
+
+
+def make_report(index, messages, rng):
+    conversation = [
+        {'type': 'ai' if turn % 2 == 0 else 'user', 'content': rng.choice(AI_LINES if turn % 2 == 0 else USER_LINES)}
+        for turn in range(messages)
+    ]
+    report = generate_conversation_based_fallback(COURSE, conversation)
+    report['conversation'] = conversation
+    report['assessmentId'] = f'{index:032x}'
+    return report
+
+
+def per_report(func, items):
+    """Mean CPU seconds of func over items"""
+    started = time.process_time()
+    results = [func(item) for item in items]
+    return (time.process_time() - started) / len(items), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=24, help='conversation messages per report')
+    parser.add_argument('--reports', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    reports = [make_report(index, args.messages, rng) for index in range(args.reports)]
+
+    print(f"{args.reports} reports, {args.messages} conversation messages each")
+    print(f"{'mode':<10} {'identity':>10} {'gzip':>10} {'br':>10} {'json us':>10} {'orjson us':>10} {'gzip us':>10} {'br us':>10}")
+    for mode in ('full', 'reference', 'omit'):
+        payloads = [{'assessment': shape_report(report, mode, f"/api/sessions/{report['assessmentId']}/assessment")} for report in reports]
+        json_time, _ = per_report(lambda payload: json.dumps(payload, sort_keys=True, separators=(',', ':')).encode(), payloads)
+        orjson_time, bodies = per_report(lambda payload: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), payloads)
+        gzip_time, gzipped = per_report(lambda body: gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0), bodies)
+        br_time, brotlied = per_report(lambda body: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY), bodies)
+        sizes = [sum(len(body) for body in encoded) / len(encoded) for encoded in (bodies, gzipped, brotlied)]
+        print(f"{mode:<10} {sizes[0]:>9.0f}B {sizes[1]:>9.0f}B {sizes[2]:>9.0f}B "
+              f"{json_time * 1e6:>10.1f} {orjson_time * 1e6:>10.1f} {gzip_time * 1e6:>10.1f} {br_time * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Microbenchmark the per-request CPU spent building phase prompts and scanning keywords.
+
+Compares rendering every phase prompt from its template on each request and
+scanning keyword lists with substring checks (how chat_assess used to work)
+against the precompiled prompt registry and combined keyword matchers.
+Run from the backend directory:
+
+    python bench/prompt_cpu.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keywords import CAREER_KEYWORDS, OFF_TOPIC_KEYWORDS, OFF_TOPIC_MATCHER, career_matcher  # noqa: E402
+from prompts import PHASE_TEMPLATES, PromptRegistry  # noqa: E402
+
+COURSE = 'Computer Science'
+PHASES = list(PHASE_TEMPLATES)
+USER_MESSAGE = ('During my final year I built a library management system with Django and PostgreSQL, '
+                'and I did a six month internship where I worked on REST APIs and some React screens.')
+OFF_TOPIC_MESSAGE = 'Honestly I would rather talk about music, movies and the weather today.'
+CONTEXT = ''.join(f"{'User' if i % 2 else 'AI'}: {USER_MESSAGE}\n" for i in range(5))
+
+
+def legacy_prompt(phase):
+    # Equivalent to evaluating the phase f-string: every substitution happens per request
+    return (PHASE_TEMPLATES[phase]
+            .replace('{course}', COURSE)
+            .replace('{user_message}', USER_MESSAGE)
+            .replace('{conversation_context}', CONTEXT))
+
+
+def legacy_off_topic(user_message):
+    user_message_lower = user_message.lower()
+    is_potentially_off_topic = any(keyword in user_message_lower for keyword in OFF_TOPIC_KEYWORDS)
+    career_keywords = CAREER_KEYWORDS + [COURSE.lower()]
+    has_career_context = any(keyword in user_message_lower for keyword in career_keywords)
+    return is_potentially_off_topic and not has_career_context
+
+
+def compiled_off_topic(user_message):
+    user_message_lower = user_message.lower()
+    return bool(OFF_TOPIC_MATCHER.search(user_message_lower)) and not career_matcher(COURSE).search(user_message_lower)
+
+
+def report(label, legacy, compiled, number):
+    legacy_time = min(timeit.repeat(legacy, number=number, repeat=5)) / number * 1e6
+    compiled_time = min(timeit.repeat(compiled, number=number, repeat=5)) / number * 1e6
+    saved = legacy_time - compiled_time
+    print(f"{label:<22} {legacy_time:>10.2f} {compiled_time:>12.2f} {saved:>10.2f} {legacy_time / compiled_time:>8.1f}x")
+
+
+def main():
+    registry = PromptRegistry()
+    registry.warm([COURSE])
+    number = 20000
+
+    print(f"{'per request (us)':<22} {'legacy':>10} {'precompiled':>12} {'saved':>10} {'speedup':>9}")
+    for phase in PHASES:
+        report(f'prompt:{phase}',
+               lambda: legacy_prompt(phase),
+               lambda: registry.render(COURSE, phase, USER_MESSAGE, CONTEXT),
+               number)
+    report('off-topic (on-topic)', lambda: legacy_off_topic(USER_MESSAGE), lambda: compiled_off_topic(USER_MESSAGE), number)
+    report('off-topic (off-topic)', lambda: legacy_off_topic(OFF_TOPIC_MESSAGE), lambda: compiled_off_topic(OFF_TOPIC_MESSAGE), number)
+
+
+if __name__ == '__main__':
+    main()
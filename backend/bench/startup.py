@@ -0,0 +1,172 @@
+"""Measure API cold start and worker memory, and compare with a baseline.
+
+Times a bare ``import app`` in fresh interpreters, then boots gunicorn
+against the mock upstream and times how long it takes until /api/health
+answers (process up) and /api/ready answers 200 (upstream reachable).
+Reports proportional (PSS) and private (USS) memory per worker, so the pages
+shared by preloading show up. Run from the backend directory:
+
+    python bench/startup.py --workers 4 --save-baseline bench/startup-baseline.json
+    python bench/startup.py --workers 4 --baseline bench/startup-baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from loadtest import compare, wait_for
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = 'import time; started = time.perf_counter(); import app; print(time.perf_counter() - started)'
+
+
+def bench_env(state_dir, **extra):
+    return dict(
+        os.environ,
+        KIMI_API_KEY=os.getenv('KIMI_API_KEY', 'bench-key-000000000000000000'),
+        LOG_LEVEL='WARNING',
+        SESSION_DB=os.path.join(state_dir, 'sessions.db'),
+        REPORT_JOB_DB=os.path.join(state_dir, 'jobs.db'),
+        UPSTREAM_RATE_LIMIT_DB=os.path.join(state_dir, 'ratelimit.db'),
+        RESULT_DB=os.path.join(state_dir, 'results.db'),
+        METRICS_DIR=os.path.join(state_dir, 'metrics'),
+        **extra
+    )
+
+
+def import_seconds(state_dir, repeat):
+    """Median wall time of ``import app`` in a fresh interpreter"""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], cwd=BACKEND_DIR, env=bench_env(state_dir),
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def wait_for_status(url, timeout=60):
+    """Poll until url answers 200 (a 503 from /api/ready counts as not yet)"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            # Refused, reset, timed out or a 503 (HTTPError is an OSError too)
+            time.sleep(0.02)
+    raise RuntimeError(f"{url} did not answer 200 within {timeout}s")
+
+
+def memory_kb(pid):
+    """(PSS, USS) of a process in kB from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as smaps:
+        for line in smaps:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields.get('Pss', 0), fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+
+
+def worker_pids(master_pid, expected, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+            pids = [int(pid) for pid in children.read().split()]
+        if len(pids) >= expected:
+            return pids
+        time.sleep(0.1)
+    raise RuntimeError(f'only {len(pids)} of {expected} workers started')
+
+
+def boot(args, state_dir, preload):
+    """Boot gunicorn once; returns time to health, time to ready and worker memory"""
+    env = bench_env(
+        state_dir,
+        PORT=str(args.api_port),
+        KIMI_API_BASE=f'http://127.0.0.1:{args.upstream_port}',
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_PRELOAD='true' if preload else 'false',
+        GUNICORN_LOG_LEVEL='warning',
+    )
+    api_url = f'http://127.0.0.1:{args.api_port}'
+    started = time.perf_counter()
+    api = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                           cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_status(f'{api_url}/api/health')
+        health = time.perf_counter() - started
+        wait_for_status(f'{api_url}/api/ready')
+        ready = time.perf_counter() - started
+        pids = worker_pids(api.pid, args.workers)
+        # Serve a few requests so each worker has touched its request path before measuring
+        for _ in range(args.workers * 4):
+            urllib.request.urlopen(f'{api_url}/api/courses', timeout=30).read()
+        pss, uss = zip(*(memory_kb(pid) for pid in pids))
+    finally:
+        api.terminate()
+        api.wait()
+    return {
+        'healthSeconds': round(health, 3),
+        'readySeconds': round(ready, 3),
+        'workerPssMb': round(statistics.mean(pss) / 1024, 1),
+        'workerUssMb': round(statistics.mean(uss) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--repeat', type=int, default=5, help='import timings and boots per mode')
+    parser.add_argument('--api-port', type=int, default=8811)
+    parser.add_argument('--upstream-port', type=int, default=8812)
+    parser.add_argument('--output', help='write the results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--save-baseline', help='write the results JSON here as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='allowed relative change before a regression')
+    args = parser.parse_args()
+
+    upstream = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'bench', 'mock_upstream.py'), '--port', str(args.upstream_port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for(f'http://127.0.0.1:{args.upstream_port}/stats')
+        result = {}
+        with tempfile.TemporaryDirectory(prefix='skillbridge-startup-') as state_dir:
+            result['importSeconds'] = round(import_seconds(state_dir, args.repeat), 3)
+            for preload in (True, False):
+                boots = [boot(args, state_dir, preload) for _ in range(args.repeat)]
+                prefix = 'preload' if preload else 'noPreload'
+                for name in boots[0]:
+                    value = statistics.median(sample[name] for sample in boots)
+                    result[prefix + name[0].upper() + name[1:]] = value
+    finally:
+        upstream.terminate()
+        upstream.wait()
+
+    result['settings'] = {'workers': args.workers, 'workerClass': args.worker_class, 'repeat': args.repeat}
+    print(json.dumps({key: value for key, value in result.items() if key != 'settings'}, indent=2))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as result_file:
+                json.dump(result, result_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger('skillbridge.cache')
+
+# Response cache settings (override through environment variables)
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Optional shared backend for multi-worker deployments, e.g. redis://localhost:6379/0
+RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def cache_key(model, prompt, temperature, namespace='completion'):
+    """Content-addressed key for a model/prompt/temperature combination"""
+    normalized_prompt = _WHITESPACE.sub(' ', prompt).strip()
+    material = json.dumps([namespace, model, normalized_prompt, round(float(temperature), 3)])
+    return f"{namespace}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+
+class MemoryCacheBackend:
+    """Per-process LRU cache with TTL expiry and a total size bound in bytes"""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key, payload, ttl):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, payload)
+            self.current_bytes += len(payload)
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, payload = self._entries.pop(key)
+        self.current_bytes -= len(payload)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'maxBytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
+
+
+class RedisCacheBackend:
+    """Cache shared by every worker through Redis (eviction follows the server's maxmemory policy)"""
+
+    def __init__(self, url):
+        import redis  # Optional dependency, only needed when RESPONSE_CACHE_REDIS_URL is set
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, payload, ttl):
+        self._client.setex(key, ttl, payload)
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+class ResponseCache:
+    """JSON value cache with hit/miss counters in front of a pluggable backend"""
+
+    def __init__(self, backend, ttl=RESPONSE_CACHE_TTL, enabled=RESPONSE_CACHE_ENABLED):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            payload = self.backend.get(key)
+        except Exception:
+            logger.exception('Response cache read failed')
+            payload = None
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Every hit returns a fresh copy, so callers may mutate the result
+        return json.loads(payload)
+
+    def set(self, key, value, ttl=None):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps(value).encode('utf-8'), ttl or self.ttl)
+        except Exception:
+            logger.exception('Response cache write failed')
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        stats.update(self.backend.stats())
+        return stats
+
+
+def create_response_cache():
+    """Build the response cache for the configured backend"""
+    if RESPONSE_CACHE_REDIS_URL:
+        return ResponseCache(RedisCacheBackend(RESPONSE_CACHE_REDIS_URL))
+    return ResponseCache(MemoryCacheBackend())
+
+
+response_cache = create_response_cache()
@@ -0,0 +1,143 @@
+import os
+import re
+
+from keywords import CHALLENGE_MATCHER, EXPERIENCE_MATCHER, SKILL_MATCHER
+
+# Token budgets for conversation context (override through environment variables)
+CONTEXT_BUDGETS = {
+    'introduction': int(os.getenv('CONTEXT_BUDGET_INTRODUCTION', '600')),
+    'exploration': int(os.getenv('CONTEXT_BUDGET_EXPLORATION', '1000')),
+    'deep-dive': int(os.getenv('CONTEXT_BUDGET_DEEP_DIVE', '1500')),
+    'analysis': int(os.getenv('CONTEXT_BUDGET_ANALYSIS', '1500')),
+    'report': int(os.getenv('CONTEXT_BUDGET_REPORT', '6000')),
+}
+# Longest a single message may be once it is placed in a prompt
+CONTEXT_MESSAGE_TOKENS = int(os.getenv('CONTEXT_MESSAGE_TOKENS', '400'))
+# Rolling summary of turns that have aged out of the recent window
+CONTEXT_SUMMARY_TOKENS = int(os.getenv('CONTEXT_SUMMARY_TOKENS', '300'))
+
+SUMMARY_PREFIX = 'Earlier in the conversation the user said: '
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (roughly 4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def format_turn(message_type, content):
+    """Format one turn the way the prompts expect"""
+    role = "User" if message_type == 'user' else "AI"
+    return f"{role}: {content}\n"
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Shorten text to about max_tokens, keeping its beginning and end"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max_tokens * 4
+    head = text[:max_chars * 2 // 3].rstrip()
+    tail = text[-(max_chars // 3):].lstrip()
+    return f"{head} … {tail}"
+
+
+def informativeness(message_type, content):
+    """Rank turns for inclusion: user answers about experience, skills and challenges first"""
+    content_lower = content.lower()
+    score = 2.0 if message_type == 'user' else 1.0
+    for matcher in (EXPERIENCE_MATCHER, SKILL_MATCHER, CHALLENGE_MATCHER):
+        if matcher.search(content_lower):
+            score += 1.0
+    return score + min(estimate_tokens(content), 200) / 200
+
+
+def extend_summary(summary, message_type, content, max_tokens=CONTEXT_SUMMARY_TOKENS):
+    """Fold one aged-out turn into the rolling summary.
+
+    The summary is extractive (the most informative sentence of each user
+    answer) so it costs no upstream call; the oldest points are dropped once
+    it is full.
+    """
+    if message_type != 'user' or not content.strip():
+        return summary
+    sentences = _SENTENCE_END.split(content.strip())
+    best_sentence = max(sentences, key=lambda sentence: informativeness('user', sentence))
+    points = [point for point in summary.split(' | ') if point] if summary else []
+    points.append(truncate_to_tokens(best_sentence, 40))
+    while len(points) > 1 and estimate_tokens(' | '.join(points)) > max_tokens:
+        points.pop(0)
+    return ' | '.join(points)
+
+
+def build_context(turns, summary, budget):
+    """Build prompt context from recent (type, content) turns within a token budget.
+
+    The newest turn is always kept; older turns are added by informativeness
+    while they fit, then emitted in conversation order after the summary.
+    """
+    if budget <= 0:
+        return ""
+
+    remaining = budget
+    summary_line = ""
+    if summary:
+        summary_line = truncate_to_tokens(SUMMARY_PREFIX + summary, max(1, budget // 4)) + "\n"
+        remaining -= estimate_tokens(summary_line)
+
+    candidates = []
+    for index, (message_type, content) in enumerate(turns):
+        line = format_turn(message_type, truncate_to_tokens(content, CONTEXT_MESSAGE_TOKENS))
+        candidates.append((index, line, estimate_tokens(line), informativeness(message_type, content)))
+
+    selected = []
+    if candidates:
+        newest = candidates[-1]
+        if newest[2] > remaining:
+            line = format_turn(turns[-1][0], truncate_to_tokens(turns[-1][1], max(1, remaining - 2)))
+            newest = (newest[0], line, estimate_tokens(line), newest[3])
+        selected.append(newest)
+        remaining -= newest[2]
+        # Prefer informative turns, breaking ties toward the most recent
+        for candidate in sorted(candidates[:-1], key=lambda c: (c[3], c[0]), reverse=True):
+            if candidate[2] <= remaining:
+                selected.append(candidate)
+                remaining -= candidate[2]
+
+    selected.sort(key=lambda c: c[0])
+    return summary_line + ''.join(candidate[1] for candidate in selected)
+
+
+def build_transcript(conversation_history, budget=CONTEXT_BUDGETS['report']):
+    """Format a full conversation for the report prompt within a token budget.
+
+    Conversations that already fit are returned exactly as before. Otherwise
+    long messages are truncated and, if that is not enough, the oldest turns
+    are compacted into a summary line.
+    """
+    turns = [('user' if msg.get('type') == 'user' else 'ai', msg.get('content', '')) for msg in conversation_history]
+    full = ''.join(format_turn(message_type, content) for message_type, content in turns)
+    if estimate_tokens(full) <= budget:
+        return full
+
+    lines = [format_turn(message_type, truncate_to_tokens(content, CONTEXT_MESSAGE_TOKENS)) for message_type, content in turns]
+    kept = []
+    remaining = budget - CONTEXT_SUMMARY_TOKENS
+    first_kept = len(lines)
+    for index in range(len(lines) - 1, -1, -1):
+        cost = estimate_tokens(lines[index])
+        if cost > remaining and kept:
+            break
+        kept.append(lines[index])
+        remaining -= cost
+        first_kept = index
+    kept.reverse()
+
+    summary = ""
+    for message_type, content in turns[:first_kept]:
+        summary = extend_summary(summary, message_type, content)
+    summary_line = SUMMARY_PREFIX + summary + "\n" if summary else ""
+    return summary_line + ''.join(kept)
+
+
+def budget_for(phase):
+    return CONTEXT_BUDGETS.get(phase, CONTEXT_BUDGETS['analysis'])
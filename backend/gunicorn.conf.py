@@ -0,0 +1,40 @@
+import multiprocessing
+import os
+
+# Gunicorn configuration for the SkillBridge API
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Chat and report requests spend almost all of their time waiting on the LLM provider,
+# so cooperative gevent workers let one process hold hundreds of in-flight assessments.
+# Set GUNICORN_WORKER_CLASS=sync to fall back to the blocking worker model.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('GUNICORN_WORKERS', str(min(4, multiprocessing.cpu_count() * 2 + 1))))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Import the app once in the master and fork workers from it: new instances become ready
+# sooner and workers share the pages holding modules, prompts and fallback templates.
+# Set GUNICORN_PRELOAD=false to import the app in every worker instead.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+if preload_app and worker_class == 'gevent':
+    # The app is imported before the workers patch themselves, so patch the master first
+    # or the locks and sockets created at import would block the whole worker.
+    from gevent import monkey
+    monkey.patch_all()
+
+# Report generation can take several upstream round-trips
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '180'))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    # Background threads started at import do not survive the fork from a preloaded master
+    import metrics
+    from log_config import configure_logging
+    configure_logging()
+    metrics.registry.start()
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from log_config import run_with_context
+
+logger = logging.getLogger('skillbridge.hedging')
+
+# Hedged request settings (override through environment variables)
+HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+HEDGE_MAX_INFLIGHT = int(os.getenv('HEDGE_MAX_INFLIGHT', '2'))
+HEDGE_POOL_SIZE = int(os.getenv('HEDGE_POOL_SIZE', '16'))
+# Batch reports get their own pool, so a cohort run never queues the chat reports of its worker
+HEDGE_BATCH_POOL_SIZE = int(os.getenv('HEDGE_BATCH_POOL_SIZE', '32'))
+# Deadline used until a model has enough report samples for a p95, and the bounds applied to it
+HEDGE_DEFAULT_DELAY = float(os.getenv('HEDGE_DEFAULT_DELAY', '20'))
+HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', '2'))
+HEDGE_MAX_DELAY = float(os.getenv('HEDGE_MAX_DELAY', '45'))
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '10'))
+
+HedgeCandidate = namedtuple('HedgeCandidate', ['name', 'model', 'call'])
+
+
+class LatencyTracker:
+    """Rolling window of successful upstream HTTP call latencies per (model, phase).
+
+    Short chat turns far outnumber reports, so samples are kept per phase and
+    a report is only ever hedged against other report calls.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, phase, seconds):
+        with self._lock:
+            samples = self._samples.get((model, phase))
+            if samples is None:
+                samples = self._samples[(model, phase)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, model, phase, q):
+        with self._lock:
+            samples = sorted(self._samples.get((model, phase), ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+        return samples[index]
+
+    def hedge_delay(self, model, phase):
+        """How long a call to model in phase may run before it is hedged"""
+        with self._lock:
+            sample_count = len(self._samples.get((model, phase), ()))
+        if sample_count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, min(HEDGE_MAX_DELAY, self.percentile(model, phase, 0.95)))
+
+
+class HedgedExecutor:
+    """Run candidates in order, starting the next one when the current one is slow or fails"""
+
+    def __init__(self, tracker, phase='report', max_workers=HEDGE_POOL_SIZE, max_inflight=HEDGE_MAX_INFLIGHT):
+        self.tracker = tracker
+        self.phase = phase
+        self.max_inflight = max_inflight if HEDGE_ENABLED else 1
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self.stats = {'launched': 0, 'hedged': 0, 'abandoned': 0, 'exhausted': 0, 'wins': {}}
+        self._lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _submit(self, candidate):
+        """Queue candidate's call; returns (future, started) where started resolves when it leaves the queue"""
+        started = Future()
+
+        def call():
+            started.set_result(time.monotonic())
+            return candidate.call()
+        return self._executor.submit(run_with_context(call)), started
+
+    def first_valid(self, candidates):
+        """Return (candidate, result) for the first candidate whose call returns non-None.
+
+        Returns (None, None) once every candidate has failed. Candidates still
+        queued when a winner arrives are cancelled and their results ignored.
+        The hedge deadline runs from when a call starts, not from when it was
+        queued, so a busy pool does not set off hedges by itself.
+        """
+        pending = {}
+        next_index = 0
+        started = latest_model = None
+        hedge_at = time.monotonic()
+
+        while True:
+            now = time.monotonic()
+            can_launch = next_index < len(candidates) and len(pending) < self.max_inflight
+            if can_launch and (not pending or (hedge_at is not None and now >= hedge_at)):
+                candidate = candidates[next_index]
+                if pending:
+                    self._count('hedged')
+                self._count('launched')
+                future, started = self._submit(candidate)
+                pending[future] = candidate
+                latest_model = candidate.model
+                hedge_at = None
+                next_index += 1
+                continue
+
+            if not pending:
+                self._count('exhausted')
+                return None, None
+
+            waiting_on = list(pending)
+            timeout = None
+            if can_launch:
+                if hedge_at is None and started.done():
+                    hedge_at = started.result() + self.tracker.hedge_delay(latest_model, self.phase)
+                if hedge_at is None:
+                    waiting_on.append(started)
+                else:
+                    timeout = max(0.0, hedge_at - now)
+            done, _ = wait(waiting_on, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future not in pending:
+                    # The latest call left the queue; its deadline is set on the next pass
+                    continue
+                candidate = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception('Hedged candidate raised', extra={'candidate': candidate.name})
+                    result = None
+
+                if result is not None:
+                    for other in pending:
+                        other.cancel()
+                    self._count('abandoned', len(pending))
+                    with self._lock:
+                        self.stats['wins'][candidate.name] = self.stats['wins'].get(candidate.name, 0) + 1
+                    return candidate, result
+
+                # A failed candidate is replaced straight away instead of waiting for the deadline
+                hedge_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['wins'] = dict(self.stats['wins'])
+        return stats
+
+
+latency_tracker = LatencyTracker()
+hedged_executor = HedgedExecutor(latency_tracker)
+batch_hedged_executor = HedgedExecutor(latency_tracker, max_workers=HEDGE_BATCH_POOL_SIZE)
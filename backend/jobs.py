@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import storage
+from log_config import run_with_context
+
+logger = logging.getLogger('skillbridge.jobs')
+
+# Background report job settings (override through environment variables)
+REPORT_JOB_STORE = os.getenv('REPORT_JOB_STORE', 'sqlite')
+# Shared by the workers of one instance only; with several instances a poll can reach one that does not
+# know the job (404), which the chat client retries until it lands on the right one
+REPORT_JOB_DB = os.getenv('REPORT_JOB_DB', os.path.join(tempfile.gettempdir(), 'skillbridge_jobs.db'))
+REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', '4'))
+REPORT_JOB_MAX_PENDING = int(os.getenv('REPORT_JOB_MAX_PENDING', '100'))
+REPORT_JOB_TTL = int(os.getenv('REPORT_JOB_TTL', '3600'))
+# A queued or running job not updated for this long is reported as failed (its worker most likely died)
+REPORT_JOB_TIMEOUT = int(os.getenv('REPORT_JOB_TIMEOUT', '900'))
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised when the report worker pool has no room for another job"""
+
+
+class MemoryJobStore:
+    """Job store kept in process memory (single worker deployments)"""
+
+    def __init__(self, ttl=REPORT_JOB_TTL):
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id):
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._jobs[job_id] = {
+                'jobId': job_id,
+                'status': JOB_QUEUED,
+                'result': None,
+                'error': None,
+                'createdAt': now,
+                'updatedAt': now,
+            }
+
+    def update(self, job_id, status, result=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update({'status': status, 'result': result, 'error': error, 'updatedAt': time.time()})
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _prune(self, now):
+        expired = [job_id for job_id, job in self._jobs.items() if now - job['updatedAt'] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Job store backed by a SQLite file so every gunicorn worker can answer polls"""
+
+    def __init__(self, path=REPORT_JOB_DB, ttl=REPORT_JOB_TTL):
+        self.path = path
+        self.ttl = ttl
+        # Set up once at start-up, where blocking on another worker's lock is harmless
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS report_jobs ('
+                ' job_id TEXT PRIMARY KEY,'
+                ' status TEXT NOT NULL,'
+                ' result TEXT,'
+                ' error TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_report_jobs_updated ON report_jobs (updated_at)')
+
+    def create(self, job_id):
+        now = time.time()
+
+        def insert(conn):
+            conn.execute('DELETE FROM report_jobs WHERE updated_at < ?', (now - self.ttl,))
+            conn.execute(
+                'INSERT INTO report_jobs (job_id, status, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                (job_id, JOB_QUEUED, now, now)
+            )
+        storage.write(self.path, insert)
+
+    def update(self, job_id, status, result=None, error=None):
+        payload = json.dumps(result) if result is not None else None
+        storage.write(self.path, lambda conn: conn.execute(
+            'UPDATE report_jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?',
+            (status, payload, error, time.time(), job_id)
+        ))
+
+    def get(self, job_id):
+        row = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT job_id, status, result, error, created_at, updated_at FROM report_jobs WHERE job_id = ?',
+            (job_id,)
+        ).fetchone())
+        if row is None:
+            return None
+        return {
+            'jobId': row[0],
+            'status': row[1],
+            'result': json.loads(row[2]) if row[2] else None,
+            'error': row[3],
+            'createdAt': row[4],
+            'updatedAt': row[5],
+        }
+
+
+class JobQueue:
+    """Bounded worker pool that runs report generation off the request path"""
+
+    def __init__(self, store, max_workers=REPORT_JOB_WORKERS, max_pending=REPORT_JOB_MAX_PENDING,
+                 timeout=REPORT_JOB_TIMEOUT):
+        self.store = store
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return its job ID"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f'{self._pending} report jobs already pending')
+            self._pending += 1
+
+        job_id = uuid.uuid4().hex
+        try:
+            self.store.create(job_id)
+            self._executor.submit(run_with_context(self._run), job_id, func, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        try:
+            self.store.update(job_id, JOB_RUNNING)
+            result = func(*args, **kwargs)
+            self.store.update(job_id, JOB_COMPLETED, result=result)
+        except Exception as e:
+            logger.exception('Report job failed', extra={'jobId': job_id})
+            self.store.update(job_id, JOB_FAILED, error=str(e))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job is not None and job['status'] in (JOB_QUEUED, JOB_RUNNING) and time.time() - job['updatedAt'] > self.timeout:
+            # Jobs live in the memory of the worker that queued them, so one that died takes its jobs with it
+            logger.warning('Report job timed out', extra={'jobId': job_id, 'status': job['status']})
+            self.store.update(job_id, JOB_FAILED, error='Report job did not finish in time')
+            job = self.store.get(job_id)
+        return job
+
+    @property
+    def pending(self):
+        return self._pending
+
+
+def create_job_store(kind=REPORT_JOB_STORE):
+    """Build the configured job store ('sqlite' or 'memory')"""
+    if kind == 'memory':
+        return MemoryJobStore()
+    if kind == 'sqlite':
+        return SQLiteJobStore()
+    raise ValueError(f"Unknown REPORT_JOB_STORE '{kind}'")
+
+
+report_jobs = JobQueue(create_job_store())
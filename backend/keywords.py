@@ -0,0 +1,47 @@
+import re
+from functools import lru_cache
+
+OFF_TOPIC_KEYWORDS = [
+    'weather', 'politics', 'sports', 'entertainment', 'food', 'travel',
+    'personal life', 'relationships', 'news', 'current events', 'jokes',
+    'stories', 'music', 'movies', 'games', 'general knowledge'
+]
+CAREER_KEYWORDS = ['skill', 'job', 'career', 'work', 'employment', 'experience', 'project']
+
+# Signals used to personalize the fallback assessment
+EXPERIENCE_KEYWORDS = ['experience', 'worked', 'internship', 'project']
+SKILL_KEYWORDS = ['skill', 'learned', 'studied', 'know']
+CHALLENGE_KEYWORDS = ['difficult', 'challenge', 'struggle', 'hard']
+
+
+class KeywordMatcher:
+    """Keyword set compiled once, matched against lowercased text.
+
+    Keywords must start at a word boundary, so inflections still match
+    ("skills", "worked") but embedded substrings do not ("transports").
+    For short lists CPython's substring search beats a regex alternation,
+    so the literals are checked first and the compiled boundary pattern only
+    runs when one of them occurs somewhere in the text.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(sorted({keyword.lower() for keyword in keywords if keyword}, key=len, reverse=True))
+        self._pattern = re.compile(r'(?<![^\W_])(?:' + '|'.join(re.escape(keyword) for keyword in self.keywords) + ')')
+
+    def search(self, text_lower):
+        for keyword in self.keywords:
+            if keyword in text_lower:
+                return self._pattern.search(text_lower)
+        return None
+
+
+OFF_TOPIC_MATCHER = KeywordMatcher(OFF_TOPIC_KEYWORDS)
+EXPERIENCE_MATCHER = KeywordMatcher(EXPERIENCE_KEYWORDS)
+SKILL_MATCHER = KeywordMatcher(SKILL_KEYWORDS)
+CHALLENGE_MATCHER = KeywordMatcher(CHALLENGE_KEYWORDS)
+
+
+@lru_cache(maxsize=256)
+def career_matcher(course):
+    """Matcher for career terms plus the course name itself"""
+    return KeywordMatcher(CAREER_KEYWORDS + [course])
@@ -0,0 +1,128 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+# Logging settings (override through environment variables)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+# Fraction of upstream calls whose request/response bodies are logged at DEBUG
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '0.01'))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv('LOG_PAYLOAD_MAX_CHARS', '2000'))
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every record with the current request's correlation ID"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed via extra= are kept as keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'requestId': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller; records are dropped when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message here but leave formatting (and the traceback) to the listener's formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+_listener = None
+_listener_pid = None
+
+
+def configure_logging():
+    """Route all logging through a queue so request handlers never wait on stdout.
+
+    Call again after a fork: the listener thread does not survive it, so
+    each worker process gets its own queue and listener.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener_pid = os.getpid()
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def should_sample_payload():
+    """Decide whether this call's payloads are dumped (only ever at DEBUG)"""
+    return LOG_PAYLOAD_SAMPLE_RATE > 0 and random.random() < LOG_PAYLOAD_SAMPLE_RATE
+
+
+def truncate_payload(text):
+    if len(text) <= LOG_PAYLOAD_MAX_CHARS:
+        return text
+    return text[:LOG_PAYLOAD_MAX_CHARS] + f'... ({len(text)} chars)'
+
+
+def run_with_context(func):
+    """Wrap func so it runs in a copy of the caller's context (keeps the request ID in worker threads)"""
+    context = contextvars.copy_context()
+
+    def runner(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return runner
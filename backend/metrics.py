@@ -0,0 +1,291 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Metrics settings (override through environment variables)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Each gunicorn worker snapshots its metrics here so /api/metrics can report all of them
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'skillbridge_metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Snapshots left behind by workers that exited longer ago than this are deleted
+METRICS_STALE_AFTER = int(os.getenv('METRICS_STALE_AFTER', '3600'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 6, 8)
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98, 1)
+
+
+class Metric:
+    """Base for one named metric with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), _copy(value)] for key, value in self._values.items()]
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each series is stored as [bucket counts..., +Inf count, sum]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class MetricsRegistry:
+    """Process-local metrics, merged across gunicorn workers through snapshot files"""
+
+    def __init__(self, directory=METRICS_DIR, flush_interval=METRICS_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics = []
+        self._flusher_pid = None
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def flush(self):
+        """Write this worker's snapshot (atomically, so readers never see a partial file)"""
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = {metric.name: metric.snapshot() for metric in self._metrics}
+        path = self._snapshot_path(os.getpid())
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(temp_path, path)
+
+    def start(self):
+        """Start the periodic flush in this process (re-run after fork, like the upstream pool)"""
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        thread = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+        thread.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _collect(self):
+        """Merge the snapshots of every worker; gauges only count workers that are still alive"""
+        self.flush()
+        merged = {metric.name: {} for metric in self._metrics}
+        now = time.time()
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                pid = int(file_name[:-len('.json')])
+                with open(path) as snapshot_file:
+                    snapshot = json.load(snapshot_file)
+                modified = os.path.getmtime(path)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(pid)
+            if not alive and now - modified > METRICS_STALE_AFTER:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            for metric in self._metrics:
+                if metric.kind == 'gauge' and not alive:
+                    continue
+                series = merged[metric.name]
+                for key, value in snapshot.get(metric.name, ()):
+                    key = tuple(key)
+                    if isinstance(value, list):
+                        current = series.get(key)
+                        series[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        series[key] = series.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        merged = self._collect()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for key, value in sorted(merged[metric.name].items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind != 'histogram':
+                    lines.append(f'{metric.name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    bucket_labels = labels + [('le', _format_value(bound) if bound != '+Inf' else bound)]
+                    lines.append(f'{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+                lines.append(f'{metric.name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{metric.name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    'skillbridge_http_requests_total', 'HTTP requests handled', ('endpoint', 'method', 'status'))
+http_request_duration = registry.histogram(
+    'skillbridge_http_request_duration_seconds', 'Time to handle an HTTP request, including streamed bodies', ('endpoint',))
+http_requests_in_flight = registry.gauge(
+    'skillbridge_http_requests_in_flight', 'HTTP requests currently being handled')
+http_response_bytes = registry.histogram(
+    'skillbridge_http_response_bytes', 'Size of non-streamed HTTP response bodies', ('endpoint',), SIZE_BUCKETS)
+upstream_duration = registry.histogram(
+    'skillbridge_upstream_request_duration_seconds', 'LLM provider call duration', ('model', 'phase', 'outcome'))
+upstream_request_bytes = registry.histogram(
+    'skillbridge_upstream_request_bytes', 'Size of LLM provider request bodies', ('phase',), SIZE_BUCKETS)
+upstream_response_bytes = registry.histogram(
+    'skillbridge_upstream_response_bytes', 'Size of LLM provider response bodies', ('phase',), SIZE_BUCKETS)
+prompt_build_duration = registry.histogram(
+    'skillbridge_prompt_build_seconds', 'Time to build a phase prompt and its context', ('phase',))
+report_attempts = registry.counter(
+    'skillbridge_report_attempts_total', 'Report generation attempts by result', ('assessment_type', 'result'))
+report_attempts_per_report = registry.histogram(
+    'skillbridge_report_attempts_per_report', 'Upstream attempts spent on one comprehensive report', (), COUNT_BUCKETS)
+reports_by_tier = registry.counter(
+    'skillbridge_reports_total', 'Comprehensive reports by the tier that produced them', ('tier',))
+upstream_retries = registry.counter(
+    'skillbridge_upstream_retries_total', 'LLM provider calls retried after a failure', ('reason',))
+upstream_rejected = registry.counter(
+    'skillbridge_upstream_rejected_total', 'LLM provider calls not made because of the circuit breaker or rate limit', ('reason',))
+admission_rejected = registry.counter(
+    'skillbridge_admission_rejected_total', 'Requests answered with 503 because the worker was at capacity', ('endpoint',))
+semantic_reuse = registry.counter(
+    'skillbridge_semantic_reuse_total', 'Semantic reuse lookups by outcome (reused, drafted, miss, guard_rejected)', ('outcome',))
+semantic_reuse_similarity = registry.histogram(
+    'skillbridge_semantic_reuse_similarity', 'Cosine similarity of the nearest past conversation', (), SIMILARITY_BUCKETS)
+semantic_reuse_drafts = registry.counter(
+    'skillbridge_semantic_reuse_drafts_total', 'Draft personalization calls by result (valid, failed)', ('result',))
+requests_rejected = registry.counter(
+    'skillbridge_requests_rejected_total', 'Requests refused by validation (too_large, invalid_json, schema)', ('endpoint', 'reason'))
+compressed_responses = registry.counter(
+    'skillbridge_compressed_responses_total', 'Responses sent compressed by content encoding', ('encoding',))
+compression_saved_bytes = registry.counter(
+    'skillbridge_compression_saved_bytes_total', 'Response bytes saved by compression', ('encoding',))
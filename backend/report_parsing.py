@@ -0,0 +1,178 @@
+import json
+import re
+import threading
+
+_FENCED_BLOCK = re.compile(r'```(?:json|JSON)?\s*(.*?)```', re.DOTALL)
+_THINK_BLOCK = re.compile(r'<think>.*?</think>', re.DOTALL)
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+REPORT_LIST_FIELDS = {
+    'skillsAnalysis': ['currentSkills', 'missingSkills', 'strengthAreas', 'improvementAreas', 'recommendedPath'],
+    'personalizedPlan': ['shortTerm', 'mediumTerm', 'longTerm', 'resources', 'projects'],
+}
+
+# How each completion was turned into a report: parsed directly, pulled out of
+# prose or code fences, completed after truncation, or rejected
+parse_stats = {'direct': 0, 'extracted': 0, 'repaired': 0, 'invalid': 0, 'failed': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome):
+    with _stats_lock:
+        parse_stats[outcome] += 1
+
+
+def _balanced_object(text, start):
+    """Return the JSON object starting at text[start], or the unterminated tail"""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1], True
+    return text[start:], False
+
+
+def _complete_partial(fragment, max_attempts=20):
+    """Close a truncated JSON object, cutting back to the last complete value.
+
+    Yields candidate completions from the longest to the shortest.
+    """
+    cut_points = []
+    stack = []
+    in_string = False
+    escaped = False
+    for index, char in enumerate(fragment):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            cut_points.append((index + 1, ''.join(reversed(stack))))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            cut_points.append((index + 1, ''.join(reversed(stack))))
+        elif char == ',':
+            cut_points.append((index, ''.join(reversed(stack))))
+
+    for cut, closers in reversed(cut_points[-max_attempts:]):
+        yield fragment[:cut] + closers
+
+
+def _loads(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r'\1', text))
+
+
+def extract_json(text):
+    """Pull a JSON object out of an LLM completion.
+
+    Returns (data, how) where how is 'direct', 'extracted' or 'repaired',
+    or (None, None) when nothing usable is found.
+    """
+    if not text:
+        return None, None
+
+    cleaned = _THINK_BLOCK.sub('', text).strip()
+    try:
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            return data, 'direct'
+    except json.JSONDecodeError:
+        pass
+
+    candidates = [block.strip() for block in _FENCED_BLOCK.findall(cleaned)]
+    candidates.append(cleaned)
+    for candidate in candidates:
+        start = candidate.find('{')
+        if start == -1:
+            continue
+        fragment, complete = _balanced_object(candidate, start)
+        if complete:
+            try:
+                data = _loads(fragment)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data, 'extracted'
+            continue
+        for repaired in _complete_partial(fragment):
+            try:
+                data = _loads(repaired)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data, 'repaired'
+    return None, None
+
+
+def validate_report(data):
+    """Check a parsed completion against the report structure and normalize it.
+
+    Returns the report, or None when it lacks the fields the results page needs.
+    """
+    skills_analysis = data.get('skillsAnalysis')
+    if not isinstance(skills_analysis, dict):
+        return None
+
+    for section, fields in REPORT_LIST_FIELDS.items():
+        values = data.get(section)
+        if not isinstance(values, dict):
+            values = {}
+            data[section] = values
+        for field in fields:
+            value = values.get(field)
+            if isinstance(value, str):
+                values[field] = [value]
+            elif not isinstance(value, list):
+                values[field] = []
+
+    if not data['skillsAnalysis']['currentSkills'] and not data['skillsAnalysis']['missingSkills']:
+        return None
+
+    for field in ('employabilityScore', 'confidence'):
+        if field in data:
+            try:
+                data[field] = max(0, min(100, int(round(float(data[field])))))
+            except (TypeError, ValueError):
+                del data[field]
+    if 'employabilityScore' not in data:
+        return None
+    return data
+
+
+def parse_report(text):
+    """Extract, repair and validate a report completion; None if unusable"""
+    data, how = extract_json(text)
+    if data is None:
+        _count('failed')
+        return None
+    report = validate_report(data)
+    if report is None:
+        _count('invalid')
+        return None
+    _count(how)
+    return report
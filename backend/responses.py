@@ -0,0 +1,114 @@
+import gzip
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+import metrics
+from validation import REPORT_CONVERSATION_MODES, ValidationError
+
+try:
+    import orjson  # Optional dependency: falls back to the standard library encoder
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # Optional dependency: without it only gzip is offered
+except ImportError:
+    brotli = None
+
+# Response encoding settings (override through environment variables)
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+# Smaller bodies fit in a packet or two anyway, so compressing them only costs CPU
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+# Brotli quality 4-5 compresses better than gzip -6 in similar time; 11 is for static assets
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+# How reports carry the conversation they were built from: full, reference or omit
+REPORT_CONVERSATION = os.getenv('REPORT_CONVERSATION', 'full')
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html'}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson (several times faster than json.dumps for reports)"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # indent and friends are only supported by the standard library encoder
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if not kwargs else super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    """Use orjson for jsonify and request.json when it is installed"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def shape_report(assessment, mode=None, url=None):
+    """Copy of a report with its echoed conversation kept, replaced by a reference, or dropped.
+
+    The client already holds the conversation it just had, so it rarely needs
+    the echo; a reference points at url, the endpoint the same caller can use
+    to fetch the report with its conversation.
+    """
+    mode = mode or REPORT_CONVERSATION
+    if mode == 'full' or 'conversation' not in assessment:
+        return assessment
+    shaped = {key: value for key, value in assessment.items() if key != 'conversation'}
+    if mode == 'reference':
+        shaped['conversationRef'] = {'messages': len(assessment['conversation'] or [])}
+        if url:
+            shaped['conversationRef']['url'] = f'{url}?conversation=full'
+    return shaped
+
+
+def report_conversation_mode(value):
+    """Validate a ?conversation= mode (None means the server default)"""
+    if value is not None and value not in REPORT_CONVERSATION_MODES:
+        raise ValidationError('conversation', f"must be one of {', '.join(REPORT_CONVERSATION_MODES)}")
+    return value
+
+
+def negotiate_encoding(accept_encodings):
+    """Best encoding both sides support ('br' or 'gzip'), honouring q-values, or None"""
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(offered)
+
+
+def compress_response(response, accept_encodings):
+    """Compress a buffered response in place when the client accepts it and it is worth it"""
+    if (not COMPRESSION_ENABLED or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(accept_encodings)
+    if encoding is None:
+        return response
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    metrics.compressed_responses.inc(encoding=encoding)
+    metrics.compression_saved_bytes.inc(len(body) - len(compressed), encoding=encoding)
+    return response
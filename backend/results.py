@@ -0,0 +1,235 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+
+import storage
+
+# Assessment result store settings (override through environment variables)
+RESULT_STORE = os.getenv('RESULT_STORE', 'sqlite')
+# Point this at persistent storage in production. WAL needs shared memory, which network filesystems
+# such as /home on Azure App Service (an SMB share) do not provide, so use RESULT_JOURNAL_MODE=DELETE
+# there, and keep a single instance writing to it.
+RESULT_DB = os.getenv('RESULT_DB', os.path.join(tempfile.gettempdir(), 'skillbridge_results.db'))
+RESULT_JOURNAL_MODE = os.getenv('RESULT_JOURNAL_MODE', 'WAL').upper()
+RESULT_PAGE_SIZE = int(os.getenv('RESULT_PAGE_SIZE', '20'))
+RESULT_MAX_PAGE_SIZE = int(os.getenv('RESULT_MAX_PAGE_SIZE', '100'))
+
+JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE', 'PERSIST')
+
+# Kept out of list summaries; a session ID is enough to read and continue someone's chat
+SUMMARY_HIDDEN_FIELDS = ('report', 'sequence', 'sessionId')
+
+
+def compress_report(report):
+    return zlib.compress(json.dumps(report, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def decompress_report(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def employability_score(report):
+    """The report's score as an int for indexing (LLM output may send it as a string)"""
+    try:
+        return int(round(float(report.get('employabilityScore'))))
+    except (TypeError, ValueError):
+        return None
+
+
+def encode_cursor(created_at, result_id):
+    return f'{created_at!r}:{result_id}'
+
+
+def decode_cursor(cursor):
+    """Split a page cursor into (created_at, result_id), or raise ValueError"""
+    created_at, _, result_id = (cursor or '').partition(':')
+    if not result_id:
+        raise ValueError('Invalid cursor')
+    return float(created_at), result_id
+
+
+class MemoryResultStore:
+    """Result store kept in process memory (single worker deployments and local runs)"""
+
+    def __init__(self):
+        self._results = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def save(self, session_id, course, report):
+        result_id = uuid.uuid4().hex
+        entry = {
+            'assessmentId': result_id,
+            'sessionId': session_id,
+            'course': course,
+            'employabilityScore': employability_score(report),
+            'assessmentType': report.get('assessmentType'),
+            'createdAt': time.time(),
+            'report': compress_report(report),
+        }
+        with self._lock:
+            self._sequence += 1
+            entry['sequence'] = self._sequence
+            self._results[result_id] = entry
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            entry = self._results.get(result_id)
+        return decompress_report(entry['report']) if entry else None
+
+    def latest_for_session(self, session_id):
+        with self._lock:
+            entries = [entry for entry in self._results.values() if entry['sessionId'] == session_id]
+        if not entries:
+            return None
+        entry = max(entries, key=lambda entry: entry['createdAt'])
+        return entry['assessmentId'], decompress_report(entry['report'])
+
+    def list(self, course=None, min_score=None, max_score=None, cursor=None, limit=RESULT_PAGE_SIZE):
+        with self._lock:
+            entries = list(self._results.values())
+        if course is not None:
+            entries = [entry for entry in entries if entry['course'] == course]
+        if min_score is not None:
+            entries = [entry for entry in entries if entry['employabilityScore'] is not None and entry['employabilityScore'] >= min_score]
+        if max_score is not None:
+            entries = [entry for entry in entries if entry['employabilityScore'] is not None and entry['employabilityScore'] <= max_score]
+        entries.sort(key=lambda entry: (entry['createdAt'], entry['assessmentId']), reverse=True)
+        if cursor:
+            position = decode_cursor(cursor)
+            entries = [entry for entry in entries if (entry['createdAt'], entry['assessmentId']) < position]
+        page = entries[:limit]
+        next_cursor = encode_cursor(page[-1]['createdAt'], page[-1]['assessmentId']) if len(entries) > limit else None
+        return [{key: value for key, value in entry.items() if key not in SUMMARY_HIDDEN_FIELDS} for entry in page], next_cursor
+
+    def iter_since(self, position=0, batch_size=500):
+        """Yield batches of (position, course, score, assessment_type, created_at, report) stored after position"""
+        with self._lock:
+            entries = sorted((entry for entry in self._results.values() if entry['sequence'] > position),
+                             key=lambda entry: entry['sequence'])
+        for start in range(0, len(entries), batch_size):
+            yield [(entry['sequence'], entry['course'], entry['employabilityScore'], entry['assessmentType'],
+                    entry['createdAt'], decompress_report(entry['report']))
+                   for entry in entries[start:start + batch_size]]
+
+
+class SQLiteResultStore:
+    """Result store backed by a SQLite file, with report JSON compressed and the filter columns indexed"""
+
+    def __init__(self, path=RESULT_DB, journal_mode=RESULT_JOURNAL_MODE):
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"RESULT_JOURNAL_MODE must be one of {', '.join(JOURNAL_MODES)}")
+        self.path = path
+        # Skipping the fsync on commit is only safe against corruption in WAL mode
+        self.synchronous = 'NORMAL' if journal_mode == 'WAL' else 'FULL'
+        # Set up once at start-up, where blocking on another worker's lock is harmless
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute(f'PRAGMA journal_mode={journal_mode}')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS assessment_results ('
+                ' result_id TEXT PRIMARY KEY,'
+                ' session_id TEXT,'
+                ' course TEXT NOT NULL,'
+                ' employability_score INTEGER,'
+                ' assessment_type TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' report BLOB NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_session ON assessment_results (session_id, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_course ON assessment_results (course, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_created ON assessment_results (created_at, result_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_results_score ON assessment_results (employability_score)')
+
+    def save(self, session_id, course, report):
+        result_id = uuid.uuid4().hex
+        row = (result_id, session_id, course, employability_score(report), report.get('assessmentType'),
+               time.time(), compress_report(report))
+        storage.write(self.path, lambda conn: conn.execute(
+            'INSERT INTO assessment_results'
+            ' (result_id, session_id, course, employability_score, assessment_type, created_at, report)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+            row
+        ), synchronous=self.synchronous)
+        return result_id
+
+    def get(self, result_id):
+        row = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT report FROM assessment_results WHERE result_id = ?', (result_id,)
+        ).fetchone())
+        return decompress_report(row[0]) if row else None
+
+    def latest_for_session(self, session_id):
+        row = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT result_id, report FROM assessment_results WHERE session_id = ?'
+            ' ORDER BY created_at DESC LIMIT 1',
+            (session_id,)
+        ).fetchone())
+        return (row[0], decompress_report(row[1])) if row else None
+
+    def list(self, course=None, min_score=None, max_score=None, cursor=None, limit=RESULT_PAGE_SIZE):
+        """One page of result summaries, newest first; returns (summaries, next_cursor)"""
+        clauses, params = [], []
+        if course is not None:
+            clauses.append('course = ?')
+            params.append(course)
+        if min_score is not None:
+            clauses.append('employability_score >= ?')
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append('employability_score <= ?')
+            params.append(max_score)
+        if cursor:
+            # Keyset pagination, so deep pages cost the same as the first one
+            created_at, result_id = decode_cursor(cursor)
+            clauses.append('(created_at < ? OR (created_at = ? AND result_id < ?))')
+            params.extend([created_at, created_at, result_id])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT result_id, course, employability_score, assessment_type, created_at'
+            f' FROM assessment_results{where} ORDER BY created_at DESC, result_id DESC LIMIT ?',
+            params + [limit + 1]
+        ).fetchall())
+        summaries = [{
+            'assessmentId': row[0],
+            'course': row[1],
+            'employabilityScore': row[2],
+            'assessmentType': row[3],
+            'createdAt': row[4],
+        } for row in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1][4], rows[limit - 1][0]) if len(rows) > limit else None
+        return summaries, next_cursor
+
+    def iter_since(self, position=0, batch_size=500):
+        """Yield batches of (position, course, score, assessment_type, created_at, report) stored after position.
+
+        Positions are SQLite rowids, which follow insertion order across every
+        worker, so a reader can resume from the last one it saw.
+        """
+        while True:
+            rows = storage.read(self.path, lambda conn: conn.execute(
+                'SELECT rowid, course, employability_score, assessment_type, created_at, report'
+                ' FROM assessment_results WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (position, batch_size)
+            ).fetchall())
+            if not rows:
+                return
+            yield [row[:5] + (decompress_report(row[5]),) for row in rows]
+            position = rows[-1][0]
+
+
+def create_result_store(kind=RESULT_STORE):
+    """Build the configured result store ('sqlite' or 'memory')"""
+    if kind == 'memory':
+        return MemoryResultStore()
+    if kind == 'sqlite':
+        return SQLiteResultStore()
+    raise ValueError(f"Unknown RESULT_STORE '{kind}'")
+
+
+result_store = create_result_store()
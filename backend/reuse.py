@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+import time
+
+import metrics
+from results import compress_report, decompress_report, result_store
+from skills import normalize, skill_aliases
+
+logger = logging.getLogger('skillbridge.reuse')
+
+# Semantic reuse settings (override through environment variables)
+SEMANTIC_REUSE_ENABLED = os.getenv('SEMANTIC_REUSE_ENABLED', 'false').lower() == 'true'
+# Cosine similarity at which a past report is returned as-is
+SEMANTIC_REUSE_THRESHOLD = float(os.getenv('SEMANTIC_REUSE_THRESHOLD', '0.92'))
+# Cosine similarity at which a past report becomes the draft for a shorter personalization call
+SEMANTIC_DRAFT_THRESHOLD = float(os.getenv('SEMANTIC_DRAFT_THRESHOLD', '0.75'))
+# Model for draft personalization calls (defaults to KIMI_MODEL)
+SEMANTIC_DRAFT_MODEL = os.getenv('SEMANTIC_DRAFT_MODEL')
+# Share of a reused report's current skills the new conversation must mention
+SEMANTIC_REUSE_MIN_SKILL_SUPPORT = float(os.getenv('SEMANTIC_REUSE_MIN_SKILL_SUPPORT', '0.5'))
+SEMANTIC_REUSE_REFRESH_INTERVAL = float(os.getenv('SEMANTIC_REUSE_REFRESH_INTERVAL', '10'))
+
+# Only reports written from a full conversation seed reuse, so reused reports never compound
+REUSABLE_TIERS = ('ai_generated', 'ai_simplified')
+
+
+def user_text(conversation_history):
+    return ' '.join(msg.get('content', '') for msg in conversation_history or [] if msg.get('type') == 'user')
+
+
+class ReuseMatch:
+    """Outcome of a reuse lookup: 'reused', 'drafted' or 'guard_rejected' (drafted after failing the guard)"""
+
+    def __init__(self, outcome, similarity, report):
+        self.outcome = outcome
+        self.similarity = similarity
+        self.report = report
+
+
+def skill_support(report, text, course):
+    """Share of the report's current skills mentioned in text (through any alias of the skill)"""
+    skills = (report.get('skillsAnalysis') or {}).get('currentSkills') or []
+    skills = [skill for skill in skills if isinstance(skill, str) and skill.strip()]
+    if not skills:
+        return 1.0
+    padded = f' {normalize(text)} '
+    supported = sum(1 for skill in skills if any(f' {alias} ' in padded for alias in skill_aliases(skill, course)))
+    return supported / len(skills)
+
+
+class SemanticReuseIndex:
+    """Nearest past report per course for a conversation, fed incrementally from the result store"""
+
+    def __init__(self, store, enabled=SEMANTIC_REUSE_ENABLED, dimensions=None, capacity=None,
+                 refresh_interval=SEMANTIC_REUSE_REFRESH_INTERVAL):
+        self.store = store
+        self.enabled = enabled
+        self.dimensions = dimensions
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.vectorizer = None
+        self.planes = None
+        self._index_class = None
+        self.courses = {}
+        self.position = 0
+        self.stats = {'lookups': 0, 'reused': 0, 'drafted': 0, 'guardRejected': 0, 'miss': 0}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Index reports stored since the last refresh"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+            if self.vectorizer is None:
+                self._build()
+            for batch in self.store.iter_since(self.position):
+                for position, course, _, assessment_type, _, report in batch:
+                    if assessment_type in REUSABLE_TIERS:
+                        self._add(course, report)
+                    self.position = position
+
+    def _build(self):
+        # NumPy is only loaded by workers that actually use reuse
+        import vectors
+        self.dimensions = self.dimensions or vectors.SEMANTIC_REUSE_DIMENSIONS
+        self.capacity = self.capacity or vectors.SEMANTIC_REUSE_MAX_ENTRIES
+        self._index_class = vectors.CourseIndex
+        self.vectorizer = vectors.HashedTfidf(self.dimensions)
+        self.planes = vectors.hyperplanes(self.dimensions)
+
+    def _add(self, course, report):
+        text = user_text(report.get('conversation'))
+        vector = self.vectorizer.vector(text, learn=True)
+        if vector is None:
+            return
+        index = self.courses.get(course.strip().lower())
+        if index is None:
+            index = self.courses[course.strip().lower()] = self._index_class(self.planes, self.capacity)
+        # The conversation is only needed for the vector; the report is kept compressed without it
+        index.add(vector, compress_report(dict(report, conversation=[])))
+
+    def match(self, course, conversation_history):
+        """ReuseMatch for the nearest past report above the draft threshold, or None"""
+        self.refresh()
+        text = user_text(conversation_history)
+        with self._lock:
+            self.stats['lookups'] += 1
+            index = self.courses.get(course.strip().lower())
+            vector = self.vectorizer.vector(text) if index is not None else None
+            nearest = index.nearest(vector) if vector is not None else None
+        if nearest is None or nearest[0] < SEMANTIC_DRAFT_THRESHOLD:
+            if nearest is not None:
+                metrics.semantic_reuse_similarity.observe(nearest[0])
+            return self._outcome(None, 'miss')
+        similarity, report_blob = nearest
+        metrics.semantic_reuse_similarity.observe(similarity)
+        report = decompress_report(report_blob)
+        if similarity < SEMANTIC_REUSE_THRESHOLD:
+            return self._outcome(ReuseMatch('drafted', similarity, report), 'drafted')
+        support = skill_support(report, text, course)
+        if support < SEMANTIC_REUSE_MIN_SKILL_SUPPORT:
+            # Near-identical wording but the graduate did not claim the same skills: personalize instead
+            logger.info('Semantic reuse rejected by skill guard', extra={'course': course, 'similarity': round(similarity, 4), 'skillSupport': round(support, 2)})
+            return self._outcome(ReuseMatch('guard_rejected', similarity, report), 'guardRejected')
+        return self._outcome(ReuseMatch('reused', similarity, report), 'reused')
+
+    def _outcome(self, match, stat):
+        with self._lock:
+            self.stats[stat] += 1
+        metrics.semantic_reuse.inc(outcome=match.outcome if match is not None else 'miss')
+        return match
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['indexedReports'] = sum(min(index.added, index.capacity) for index in self.courses.values())
+        stats['enabled'] = self.enabled
+        stats['hitRate'] = round(stats['reused'] / stats['lookups'], 4) if stats['lookups'] else 0.0
+        return stats
+
+
+semantic_index = SemanticReuseIndex(result_store)
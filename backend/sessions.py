@@ -0,0 +1,212 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+
+import storage
+from context_budget import build_context, budget_for, extend_summary
+
+# Chat session settings (override through environment variables)
+SESSION_STORE = os.getenv('SESSION_STORE', 'sqlite')
+SESSION_DB = os.getenv('SESSION_DB', os.path.join(tempfile.gettempdir(), 'skillbridge_sessions.db'))
+SESSION_TTL = int(os.getenv('SESSION_TTL', '7200'))
+# Recent turns kept verbatim for the phase prompts; older ones roll into the summary
+SESSION_CONTEXT_TURNS = int(os.getenv('SESSION_CONTEXT_TURNS', '8'))
+
+
+class SessionNotFound(Exception):
+    """Raised when a session ID is unknown or has expired"""
+
+
+class ChatSession:
+    """Server-side state for one assessment conversation"""
+
+    def __init__(self, store, session_id, course, phase, user_profile, message_count, recent_turns=(), summary=''):
+        self.store = store
+        self.session_id = session_id
+        self.course = course
+        self.phase = phase
+        self.user_profile = user_profile
+        self.message_count = message_count
+        self.recent_turns = deque((tuple(turn) for turn in recent_turns), maxlen=SESSION_CONTEXT_TURNS)
+        self.summary = summary
+
+    def context_for(self, phase):
+        """Recent turns plus the rolling summary, fitted to the phase's token budget"""
+        return build_context(self.recent_turns, self.summary, budget_for(phase))
+
+    def context_state(self):
+        return {'recent': [list(turn) for turn in self.recent_turns], 'summary': self.summary}
+
+    def history(self):
+        """Full conversation as the list of {'type', 'content'} dicts the report expects"""
+        return [{'type': message_type, 'content': content} for message_type, content in self.store.turns(self.session_id)]
+
+    def append(self, turns, phase=None, user_profile=None):
+        """Append (type, content) turns and persist the updated session state"""
+        for message_type, content in turns:
+            if len(self.recent_turns) == self.recent_turns.maxlen:
+                # The oldest turn is about to age out of the window, so fold it into the summary
+                self.summary = extend_summary(self.summary, *self.recent_turns[0])
+            self.recent_turns.append((message_type, content))
+        self.message_count += len(turns)
+        if phase is not None:
+            self.phase = phase
+        if user_profile is not None:
+            self.user_profile = user_profile
+        self.store.append(self, turns)
+
+
+def _compact_turns(conversation_history):
+    """Reduce client-side message objects to (type, content) pairs"""
+    return [('user' if msg.get('type') == 'user' else 'ai', msg.get('content', '')) for msg in conversation_history]
+
+
+class MemorySessionStore:
+    """Session store kept in process memory (single worker or sticky sessions)"""
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, course, phase, user_profile, conversation_history=()):
+        turns = _compact_turns(conversation_history)
+        session = ChatSession(self, uuid.uuid4().hex, course, phase, user_profile, 0)
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._sessions[session.session_id] = {'session': session, 'turns': [], 'updatedAt': now}
+        session.append(turns)
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.time() - entry['updatedAt'] > self.ttl:
+                raise SessionNotFound(session_id)
+            return entry['session']
+
+    def append(self, session, turns):
+        with self._lock:
+            entry = self._sessions.get(session.session_id)
+            if entry is None:
+                raise SessionNotFound(session.session_id)
+            entry['turns'].extend(turns)
+            entry['updatedAt'] = time.time()
+
+    def turns(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return list(entry['turns']) if entry else []
+
+    def _prune(self, now):
+        expired = [session_id for session_id, entry in self._sessions.items() if now - entry['updatedAt'] > self.ttl]
+        for session_id in expired:
+            del self._sessions[session_id]
+
+
+class SQLiteSessionStore:
+    """Session store backed by a SQLite file so any gunicorn worker can serve the next turn"""
+
+    def __init__(self, path=SESSION_DB, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        # Set up once at start-up, where blocking on another worker's lock is harmless
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS chat_sessions ('
+                ' session_id TEXT PRIMARY KEY,'
+                ' course TEXT NOT NULL,'
+                ' phase TEXT NOT NULL,'
+                ' user_profile TEXT NOT NULL,'
+                ' message_count INTEGER NOT NULL,'
+                ' context TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS chat_turns ('
+                ' session_id TEXT NOT NULL,'
+                ' seq INTEGER NOT NULL,'
+                ' type TEXT NOT NULL,'
+                ' content TEXT NOT NULL,'
+                ' PRIMARY KEY (session_id, seq))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions (updated_at)')
+
+    def create(self, course, phase, user_profile, conversation_history=()):
+        turns = _compact_turns(conversation_history)
+        session = ChatSession(self, uuid.uuid4().hex, course, phase, user_profile, 0)
+        now = time.time()
+
+        def insert(conn):
+            expired = conn.execute('SELECT session_id FROM chat_sessions WHERE updated_at < ?', (now - self.ttl,)).fetchall()
+            if expired:
+                conn.executemany('DELETE FROM chat_turns WHERE session_id = ?', expired)
+                conn.executemany('DELETE FROM chat_sessions WHERE session_id = ?', expired)
+            conn.execute(
+                'INSERT INTO chat_sessions (session_id, course, phase, user_profile, message_count, context, updated_at)'
+                ' VALUES (?, ?, ?, ?, 0, ?, ?)',
+                (session.session_id, course, phase, json.dumps(user_profile), json.dumps(session.context_state()), now)
+            )
+        storage.write(self.path, insert)
+        session.append(turns)
+        return session
+
+    def get(self, session_id):
+        row = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT course, phase, user_profile, message_count, context, updated_at'
+            ' FROM chat_sessions WHERE session_id = ?',
+            (session_id,)
+        ).fetchone())
+        if row is None or time.time() - row[5] > self.ttl:
+            raise SessionNotFound(session_id)
+        context = json.loads(row[4])
+        if not isinstance(context, dict):
+            context = {}
+        return ChatSession(self, session_id, row[0], row[1], json.loads(row[2]), row[3],
+                           context.get('recent', ()), context.get('summary', ''))
+
+    def append(self, session, turns):
+        # Two turns on one session can run at once (e.g. a client retrying after a timeout), so sequence
+        # numbers come from the stored turns under the write lock, not from this request's message_count
+        def insert(conn):
+            first_seq = conn.execute(
+                'SELECT COALESCE(MAX(seq) + 1, 0) FROM chat_turns WHERE session_id = ?', (session.session_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                'INSERT INTO chat_turns (session_id, seq, type, content) VALUES (?, ?, ?, ?)',
+                [(session.session_id, first_seq + offset, message_type, content)
+                 for offset, (message_type, content) in enumerate(turns)]
+            )
+            session.message_count = first_seq + len(turns)
+            conn.execute(
+                'UPDATE chat_sessions SET phase = ?, user_profile = ?, message_count = ?, context = ?, updated_at = ?'
+                ' WHERE session_id = ?',
+                (session.phase, json.dumps(session.user_profile), session.message_count,
+                 json.dumps(session.context_state()), time.time(), session.session_id)
+            )
+        storage.write(self.path, insert)
+
+    def turns(self, session_id):
+        return storage.read(self.path, lambda conn: conn.execute(
+            'SELECT type, content FROM chat_turns WHERE session_id = ? ORDER BY seq',
+            (session_id,)
+        ).fetchall())
+
+
+def create_session_store(kind=SESSION_STORE):
+    """Build the configured session store ('sqlite' or 'memory')"""
+    if kind == 'memory':
+        return MemorySessionStore()
+    if kind == 'sqlite':
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown SESSION_STORE '{kind}'")
+
+
+session_store = create_session_store()
@@ -0,0 +1,337 @@
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+# Skill canonicalization settings (override through environment variables)
+SKILL_CANONICALIZATION = os.getenv('SKILL_CANONICALIZATION', 'true').lower() == 'true'
+# Minimum character-trigram Jaccard similarity for a fuzzy match
+SKILL_MATCH_THRESHOLD = float(os.getenv('SKILL_MATCH_THRESHOLD', '0.55'))
+SKILL_CACHE_SIZE = int(os.getenv('SKILL_CACHE_SIZE', '8192'))
+
+# Canonical skill -> aliases. Matching is against the normalized forms, so
+# case, punctuation and "skills"/"knowledge of" style padding do not matter.
+GENERAL_SKILLS = {
+    'Communication': ['communication', 'communication skills', 'verbal communication', 'written communication'],
+    'Public Speaking': ['presentation', 'presentations', 'presentation skills', 'public speaking'],
+    'Teamwork': ['teamwork', 'team work', 'collaboration', 'working in teams'],
+    'Leadership': ['leadership', 'team leadership', 'people management'],
+    'Problem Solving': ['problem solving', 'problem-solving', 'analytical problem solving'],
+    'Critical Thinking': ['critical thinking', 'analytical thinking', 'logical thinking'],
+    'Time Management': ['time management', 'prioritization', 'meeting deadlines'],
+    'Project Management': ['project management', 'project planning', 'managing projects'],
+    'Professional Networking': ['professional networking', 'networking', 'industry networking', 'building connections'],
+    'Research': ['research', 'research skills', 'research methods'],
+    'Technical Writing': ['technical writing', 'technical documentation', 'documentation', 'report writing'],
+    'Microsoft Excel': ['excel', 'ms excel', 'microsoft excel', 'spreadsheets', 'advanced excel'],
+    'Microsoft Office': ['microsoft office', 'ms office', 'office suite', 'word and powerpoint'],
+    'Data Analysis': ['data analysis', 'data analytics', 'analysing data', 'analyzing data'],
+    'Industry Experience': ['industry experience', 'work experience', 'practical experience', 'professional experience'],
+    'Professional Portfolio': ['portfolio', 'professional portfolio', 'portfolio development'],
+    'Professional Certification': ['certification', 'certifications', 'professional certification', 'professional certifications'],
+}
+
+COURSE_FAMILY_SKILLS = {
+    'computing': {
+        'Version Control': ['version control', 'git', 'github', 'git github', 'git and github', 'gitlab', 'source control'],
+        'Python': ['python', 'python programming', 'python 3'],
+        'JavaScript': ['javascript', 'js', 'es6', 'javascript programming'],
+        'TypeScript': ['typescript', 'ts'],
+        'Java': ['java', 'java programming'],
+        'SQL': ['sql', 'sql databases', 'mysql', 'postgresql', 'postgres', 'relational databases', 'database management'],
+        'Web Development': ['web development', 'html css', 'html and css', 'html', 'css', 'frontend development', 'front end development'],
+        'React': ['react', 'reactjs', 'react js', 'react.js'],
+        'Backend Development': ['backend development', 'back end development', 'server side development', 'node', 'nodejs', 'node js'],
+        'Django': ['django', 'django framework'],
+        'REST APIs': ['rest apis', 'rest api', 'restful apis', 'api development', 'apis'],
+        'Automated Testing': ['automated testing', 'unit testing', 'software testing', 'testing', 'test automation', 'pytest'],
+        'Cloud Computing': ['cloud computing', 'cloud', 'aws', 'azure', 'google cloud', 'gcp', 'cloud deployment', 'cloud platforms'],
+        'DevOps': ['devops', 'ci cd', 'ci/cd', 'continuous integration', 'docker', 'containerization', 'kubernetes'],
+        'Data Structures and Algorithms': ['data structures and algorithms', 'data structures', 'algorithms', 'dsa'],
+        'Machine Learning': ['machine learning', 'ml', 'deep learning', 'artificial intelligence', 'ai'],
+        'Computer Networking': ['networking', 'computer networking', 'computer networks', 'network administration'],
+        'Cybersecurity': ['cybersecurity', 'cyber security', 'information security', 'network security'],
+        'System Design': ['system design', 'software architecture', 'systems design'],
+        'Programming Fundamentals': ['programming fundamentals', 'programming', 'coding', 'basic programming'],
+    },
+    'engineering': {
+        'CAD Software': ['cad', 'cad software', 'autocad', 'solidworks', 'computer aided design', 'catia'],
+        'MATLAB': ['matlab', 'matlab simulink', 'simulink'],
+        'Circuit Design': ['circuit design', 'circuit analysis', 'electronics design', 'pcb design'],
+        'Technical Drawing': ['technical drawing', 'engineering drawing', 'drafting'],
+        'Structural Analysis': ['structural analysis', 'structural design', 'finite element analysis', 'fea'],
+        'Health and Safety': ['health and safety', 'hse', 'safety regulations', 'workplace safety'],
+        'Engineering Software Tools': ['industry software tools', 'engineering software', 'engineering tools'],
+    },
+    'business': {
+        'Financial Analysis': ['financial analysis', 'financial analysis tools', 'financial reporting', 'financial statements'],
+        'Financial Modeling': ['financial modeling', 'financial modelling', 'excel modeling', 'valuation'],
+        'Accounting Software': ['accounting software', 'quickbooks', 'sage', 'tally', 'peachtree'],
+        'Bookkeeping': ['bookkeeping', 'book keeping', 'record keeping'],
+        'Auditing': ['auditing', 'audit', 'internal audit', 'external audit'],
+        'Taxation': ['taxation', 'tax', 'tax preparation', 'tax compliance'],
+        'Digital Marketing': ['digital marketing', 'social media marketing', 'online marketing', 'seo', 'content marketing'],
+        'Market Research': ['market research', 'market analysis', 'consumer research'],
+        'Sales': ['sales', 'selling', 'business development'],
+        'Business Strategy': ['business strategy', 'strategic planning', 'strategy'],
+        'Econometrics': ['econometrics', 'stata', 'eviews', 'statistical modeling', 'statistical modelling'],
+        'Negotiation': ['negotiation', 'negotiating', 'negotiation skills'],
+    },
+    'health': {
+        'Clinical Skills': ['clinical skills', 'clinical practice', 'patient care', 'clinical experience'],
+        'Laboratory Techniques': ['laboratory techniques', 'lab techniques', 'laboratory skills', 'lab skills', 'wet lab'],
+        'Medical Research': ['medical research', 'clinical research', 'biomedical research'],
+        'Bioinformatics': ['bioinformatics', 'computational biology'],
+    },
+    'law': {
+        'Legal Research': ['legal research', 'case law research', 'lexis nexis', 'westlaw'],
+        'Legal Drafting': ['legal drafting', 'drafting contracts', 'contract drafting', 'legal writing'],
+        'Litigation': ['litigation', 'advocacy', 'court practice', 'moot court'],
+        'Corporate Law': ['corporate law', 'company law', 'commercial law'],
+    },
+    'media': {
+        'Content Writing': ['content writing', 'copywriting', 'writing', 'content creation'],
+        'Journalism': ['journalism', 'news writing', 'reporting'],
+        'Video Editing': ['video editing', 'video production', 'premiere pro', 'final cut'],
+        'Graphic Design': ['graphic design', 'canva', 'photoshop', 'adobe photoshop'],
+        'Social Media Management': ['social media management', 'social media', 'community management'],
+        'Public Relations': ['public relations', 'pr', 'media relations'],
+    },
+}
+
+# Course name fragments -> taxonomy families
+COURSE_FAMILIES = [
+    (('computer', 'software', 'information', 'mathematics', 'physics'), ('computing',)),
+    (('engineering',), ('engineering',)),
+    (('business', 'management', 'marketing', 'accounting', 'banking', 'finance', 'economics'), ('business',)),
+    (('medicine', 'nursing', 'pharmacy', 'biochemistry', 'chemistry', 'agriculture', 'psychology'), ('health',)),
+    (('law', 'international relations'), ('law',)),
+    (('communication', 'english', 'journalism'), ('media',)),
+]
+
+RESOURCE_PROVIDERS = {
+    'coursera': 'Coursera', 'edx': 'edX', 'udemy': 'Udemy', 'youtube': 'YouTube',
+    'freecodecamp': 'freeCodeCamp', 'khan academy': 'Khan Academy', 'khanacademy': 'Khan Academy',
+    'linkedin learning': 'LinkedIn Learning', 'microsoft learn': 'Microsoft Learn', 'google': 'Google',
+    'alison': 'Alison', 'futurelearn': 'FutureLearn', 'codecademy': 'Codecademy', 'w3schools': 'W3Schools',
+}
+
+# strengthAreas and improvementAreas are free-text descriptions, which fuzzy matching would rewrite lossily
+# ("Presentation design" -> "Public Speaking"), so only the lists of individual skills are canonicalized
+SKILL_LIST_FIELDS = ('currentSkills', 'missingSkills')
+
+_PADDING = re.compile(
+    r'^(?:(?:knowledge|understanding|proficiency|experience|familiarity) (?:of|in|with) |(?:basic|advanced|strong|good) )+'
+    r'|(?: (?:skills?|knowledge|proficiency|fundamentals?))+$'
+)
+_NON_WORD = re.compile(r'[^a-z0-9+#]+')
+_URL_PREFIX = re.compile(r'^(?:https?://)?(?:www\.)?')
+_PLACEHOLDER_HOSTS = ('example.com', 'example.org')
+
+# How each skill string was resolved since start-up
+canonical_stats = {'exact': 0, 'fuzzy': 0, 'unmatched': 0, 'resourcesMerged': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(outcome, amount=1):
+    with _stats_lock:
+        canonical_stats[outcome] += amount
+
+
+def normalize(text):
+    """Lowercase, unify punctuation and strip padding words ("Strong Git skills" -> "git")"""
+    text = text.lower().replace('&', ' and ')
+    text = _NON_WORD.sub(' ', text).strip()
+    return _PADDING.sub('', text).strip()
+
+
+def shingles(text):
+    padded = f' {text} '
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+class MinHashIndex:
+    """Locality-sensitive index over character trigrams for fuzzy skill lookups.
+
+    Each entry gets a NUM_PERM MinHash signature split into BANDS bands;
+    entries sharing any band are candidates and are then ranked by exact
+    trigram Jaccard. With 2 rows per band, pairs at Jaccard 0.5 collide in at
+    least one band more than 99% of the time.
+    """
+
+    NUM_PERM = 32
+    BANDS = 16
+    _PRIME = (1 << 61) - 1
+    _PARAMS = [(1 + 2 * index * 0x9E3779B1 % ((1 << 61) - 2), index * 0x85EBCA77 + 1) for index in range(NUM_PERM)]
+
+    def __init__(self, entries):
+        self.rows = self.NUM_PERM // self.BANDS
+        self.entries = []
+        self.buckets = defaultdict(list)
+        for text, canonical in entries:
+            entry_shingles = shingles(text)
+            entry_id = len(self.entries)
+            self.entries.append((entry_shingles, canonical))
+            for band_key in self._band_keys(entry_shingles):
+                self.buckets[band_key].append(entry_id)
+
+    def _band_keys(self, text_shingles):
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in text_shingles]
+        signature = [min((a * value + b) % self._PRIME for value in hashes) for a, b in self._PARAMS]
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.BANDS)]
+
+    def query(self, text, threshold):
+        """Return (canonical, similarity) of the closest entry at or above threshold, or None"""
+        text_shingles = shingles(text)
+        candidates = set()
+        for band_key in self._band_keys(text_shingles):
+            candidates.update(self.buckets.get(band_key, ()))
+        best = None
+        for entry_id in candidates:
+            entry_shingles, canonical = self.entries[entry_id]
+            similarity = len(text_shingles & entry_shingles) / len(text_shingles | entry_shingles)
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (canonical, similarity)
+        return best
+
+
+class SkillTaxonomy:
+    """Exact alias table plus MinHash index for one course family set"""
+
+    def __init__(self, skills):
+        self.lookup = {}
+        self.aliases = defaultdict(set)
+        for canonical, aliases in skills.items():
+            for alias in [canonical] + aliases:
+                normalized = normalize(alias)
+                if self.lookup.setdefault(normalized, canonical) == canonical:
+                    self.aliases[canonical].add(normalized)
+        self.index = MinHashIndex(self.lookup.items())
+
+    def resolve(self, normalized):
+        """Return (canonical or None, how) for an already-normalized skill"""
+        canonical = self.lookup.get(normalized)
+        if canonical is not None:
+            return canonical, 'exact'
+        match = self.index.query(normalized, SKILL_MATCH_THRESHOLD) if normalized else None
+        if match is not None:
+            return match[0], 'fuzzy'
+        return None, 'unmatched'
+
+
+@lru_cache(maxsize=256)
+def course_families(course):
+    course_lower = (course or '').lower()
+    return tuple(sorted({family for fragments, families in COURSE_FAMILIES
+                         if any(fragment in course_lower for fragment in fragments) for family in families}))
+
+
+@lru_cache(maxsize=32)
+def taxonomy_for(families):
+    """Taxonomy for a family set; course-specific aliases win over general ones (e.g. "networking")"""
+    skills = {}
+    for family in families:
+        skills.update(COURSE_FAMILY_SKILLS[family])
+    for canonical, aliases in GENERAL_SKILLS.items():
+        skills.setdefault(canonical, aliases)
+    return SkillTaxonomy(skills)
+
+
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _resolve_cached(families, skill):
+    # Keyed on the raw string so a repeat costs one dict lookup, normalization included
+    return taxonomy_for(families).resolve(normalize(skill))
+
+
+def canonical_skill(skill, course=None):
+    """Canonical name for a free-text skill; unmatched skills keep their original wording"""
+    canonical, how = _resolve_cached(course_families(course), skill)
+    _count(how)
+    return canonical or skill.strip()
+
+
+def canonicalize_skills(skills, course=None):
+    """Canonicalize a list of skills, dropping duplicates while keeping the first position"""
+    seen = set()
+    result = []
+    for skill in skills:
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        canonical = canonical_skill(skill, course)
+        key = canonical.lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(canonical)
+    return result
+
+
+def _resource_key(resource):
+    url = _URL_PREFIX.sub('', str(resource.get('url') or '').strip().lower()).rstrip('/')
+    if url and not url.startswith(_PLACEHOLDER_HOSTS):
+        return 'url:' + url
+    return 'title:' + normalize(str(resource.get('title') or ''))
+
+
+def canonical_provider(provider):
+    normalized = normalize(provider)
+    for name, canonical in RESOURCE_PROVIDERS.items():
+        if name in normalized:
+            return canonical
+    return provider.strip()
+
+
+def canonicalize_resources(resources):
+    """Merge duplicate resources (same URL, or same title when the URL is a placeholder)"""
+    seen = set()
+    result = []
+    for resource in resources:
+        if not isinstance(resource, dict):
+            continue
+        key = _resource_key(resource)
+        if key in seen:
+            _count('resourcesMerged')
+            continue
+        seen.add(key)
+        if isinstance(resource.get('provider'), str) and resource['provider'].strip():
+            resource = dict(resource, provider=canonical_provider(resource['provider']))
+        result.append(resource)
+    return result
+
+
+def canonicalize_report(report, course=None):
+    """Canonicalize the skill lists of skillsAnalysis, project skills and resources of a report in place"""
+    if not SKILL_CANONICALIZATION:
+        return report
+    skills_analysis = report.get('skillsAnalysis')
+    if isinstance(skills_analysis, dict):
+        for field in SKILL_LIST_FIELDS:
+            if isinstance(skills_analysis.get(field), list):
+                skills_analysis[field] = canonicalize_skills(skills_analysis[field], course)
+    plan = report.get('personalizedPlan')
+    if isinstance(plan, dict):
+        if isinstance(plan.get('resources'), list):
+            plan['resources'] = canonicalize_resources(plan['resources'])
+        for project in plan.get('projects') or []:
+            if isinstance(project, dict) and isinstance(project.get('skills'), list):
+                project['skills'] = canonicalize_skills(project['skills'], course)
+    return report
+
+
+def skill_aliases(skill, course=None):
+    """Normalized aliases of a skill's canonical form (just the skill itself when it is not in the taxonomy)"""
+    families = course_families(course)
+    canonical, _ = _resolve_cached(families, skill)
+    aliases = set(taxonomy_for(families).aliases.get(canonical, ())) if canonical else set()
+    aliases.add(normalize(skill))
+    aliases.discard('')
+    return aliases
+
+
+def skill_stats():
+    with _stats_lock:
+        stats = dict(canonical_stats)
+    cache = _resolve_cached.cache_info()
+    stats.update({'cacheHits': cache.hits, 'cacheMisses': cache.misses, 'cacheSize': cache.currsize})
+    return stats
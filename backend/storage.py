@@ -0,0 +1,76 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+# SQLite settings for the stores shared by gunicorn workers (override through environment variables)
+# Longest a store operation retries while another worker holds the database lock
+SQLITE_LOCK_WAIT = float(os.getenv('SQLITE_LOCK_WAIT', '10'))
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+
+def connect(path, synchronous='NORMAL'):
+    """Connection that never blocks a gevent worker inside SQLite.
+
+    timeout=0 because SQLite's busy wait sleeps in C, which gevent cannot
+    switch out of; callers wait for the lock with time.sleep instead (see
+    retry_locked). synchronous=NORMAL skips the fsync on every commit, which
+    in WAL mode is still safe against corruption.
+    """
+    # isolation_level=None so write() decides when the transaction starts
+    conn = sqlite3.connect(path, timeout=0, isolation_level=None)
+    conn.execute(f'PRAGMA synchronous={synchronous}')
+    return conn
+
+
+def retry_locked(operation, lock_wait=SQLITE_LOCK_WAIT):
+    """Call operation() until it gets past another worker's lock, sleeping between attempts"""
+    deadline = time.monotonic() + lock_wait
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) or time.monotonic() >= deadline:
+                raise
+        time.sleep(random.uniform(0, min(0.01, 0.001 * 2 ** attempt)))
+        attempt += 1
+
+
+def _process_lock(path):
+    with _process_locks_guard:
+        return _process_locks.setdefault(path, threading.Lock())
+
+
+def read(path, query):
+    """Return query(conn) run on a fresh connection"""
+    def attempt():
+        conn = connect(path)
+        try:
+            return query(conn)
+        finally:
+            conn.close()
+    return retry_locked(attempt)
+
+
+def write(path, change, synchronous='NORMAL', lock_wait=SQLITE_LOCK_WAIT):
+    """Run change(conn) in one transaction that holds the write lock from the start, and return its result"""
+    def attempt():
+        conn = connect(path, synchronous)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            result = change(conn)
+            conn.execute('COMMIT')
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    # Greenlets of one worker take turns, so only one per process contends for the database lock
+    with _process_lock(path):
+        return retry_locked(attempt, lock_wait)
@@ -0,0 +1,236 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import storage
+
+# Upstream rate limit settings (override through environment variables)
+# Opt-in: when enabled, every worker of an instance together makes at most UPSTREAM_RATE_MAX calls per
+# second, and calls that cannot get a token within UPSTREAM_RATE_WAIT are not made (chat falls back)
+UPSTREAM_RATE_LIMIT_ENABLED = os.getenv('UPSTREAM_RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+UPSTREAM_RATE_LIMIT_DB = os.getenv('UPSTREAM_RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'skillbridge_ratelimit.db'))
+# Requests per second shared by every worker; the rate halves on a 429 and creeps back up on success
+UPSTREAM_RATE_MAX = float(os.getenv('UPSTREAM_RATE_MAX', '50'))
+UPSTREAM_RATE_MIN = float(os.getenv('UPSTREAM_RATE_MIN', '0.2'))
+UPSTREAM_RATE_INCREASE = float(os.getenv('UPSTREAM_RATE_INCREASE', '0.1'))
+UPSTREAM_RATE_BURST = float(os.getenv('UPSTREAM_RATE_BURST', '50'))
+# Longest a call waits for a token before giving up
+UPSTREAM_RATE_WAIT = float(os.getenv('UPSTREAM_RATE_WAIT', '10'))
+# Longest a bucket update retries while another worker holds the database lock
+UPSTREAM_RATE_LOCK_WAIT = float(os.getenv('UPSTREAM_RATE_LOCK_WAIT', '10'))
+
+# Retry settings for 429s, 5xx responses and connection errors
+UPSTREAM_MAX_RETRIES = int(os.getenv('UPSTREAM_MAX_RETRIES', '2'))
+UPSTREAM_BACKOFF_BASE = float(os.getenv('UPSTREAM_BACKOFF_BASE', '0.5'))
+UPSTREAM_BACKOFF_MAX = float(os.getenv('UPSTREAM_BACKOFF_MAX', '8'))
+# A Retry-After longer than this is not waited out; the circuit opens for that long instead
+UPSTREAM_RETRY_AFTER_MAX = float(os.getenv('UPSTREAM_RETRY_AFTER_MAX', '10'))
+
+# Circuit breaker settings
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
+
+# Admission control: chat requests one worker handles at once before answering 503
+MAX_INFLIGHT_REQUESTS = int(os.getenv('MAX_INFLIGHT_REQUESTS', '200'))
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Adaptive token bucket kept in SQLite so every gunicorn worker draws from one budget"""
+
+    def __init__(self, path=UPSTREAM_RATE_LIMIT_DB, name='upstream', max_rate=UPSTREAM_RATE_MAX,
+                 min_rate=UPSTREAM_RATE_MIN, burst=UPSTREAM_RATE_BURST, increase=UPSTREAM_RATE_INCREASE):
+        self.path = path
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        # Last rate read from the bucket, so steady-state successes skip the write
+        self.rate = max_rate
+        # Set up once at start-up, where blocking on another worker's lock is harmless
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_buckets ('
+                ' name TEXT PRIMARY KEY,'
+                ' tokens REAL NOT NULL,'
+                ' rate REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'INSERT OR IGNORE INTO rate_buckets (name, tokens, rate, updated_at) VALUES (?, ?, ?, ?)',
+                (name, burst, max_rate, time.time())
+            )
+
+    def _update(self, change):
+        """Run change(tokens, rate) -> (tokens, rate, result) atomically after refilling the bucket"""
+        def transaction(conn):
+            tokens, rate, updated_at = conn.execute(
+                'SELECT tokens, rate, updated_at FROM rate_buckets WHERE name = ?', (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens = min(self.burst, tokens + max(0.0, now - updated_at) * rate)
+            tokens, rate, result = change(tokens, rate)
+            self.rate = rate
+            conn.execute(
+                'UPDATE rate_buckets SET tokens = ?, rate = ?, updated_at = ? WHERE name = ?',
+                (tokens, rate, now, self.name)
+            )
+            return result
+        return storage.write(self.path, transaction, lock_wait=UPSTREAM_RATE_LOCK_WAIT)
+
+    def _take(self, tokens, rate):
+        if tokens >= 1:
+            return tokens - 1, rate, 0.0
+        return tokens, rate, (1 - tokens) / rate
+
+    def acquire(self, max_wait=UPSTREAM_RATE_WAIT):
+        """Take one token, sleeping until one is available; False if that would exceed max_wait"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            wait = self._update(self._take)
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase after a successful call (no write while the rate is already at its maximum)"""
+        if self.rate >= self.max_rate:
+            return
+        self._update(lambda tokens, rate: (tokens, min(self.max_rate, rate + self.increase), None))
+
+    def on_throttled(self):
+        """Multiplicative decrease after a 429, draining the burst so workers back off together"""
+        self._update(lambda tokens, rate: (min(tokens, 0.0), max(self.min_rate, rate / 2), None))
+
+    def stats(self):
+        tokens, rate, _ = storage.read(self.path, lambda conn: conn.execute(
+            'SELECT tokens, rate, updated_at FROM rate_buckets WHERE name = ?', (self.name,)
+        ).fetchone())
+        return {'rate': round(rate, 3), 'tokens': round(tokens, 2), 'maxRate': self.max_rate, 'burst': self.burst}
+
+
+class CircuitBreaker:
+    """Stops upstream calls after repeated failures, then lets a single probe through after a cool-down"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_count = 0
+        self._state = self.CLOSED
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._open_until:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+
+    def allow(self):
+        """Whether a call may go upstream now (in half-open state only one probe is allowed)"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+        with self._lock:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, open_for=None):
+        """Count a failure; open_for forces the circuit open that long (e.g. a long Retry-After)"""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if open_for is not None or self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened_count += 1
+                self._state = self.OPEN
+                self._open_until = time.monotonic() + max(open_for or 0.0, self.reset_timeout)
+
+    def snapshot(self):
+        state = self.state
+        with self._lock:
+            return {'state': state, 'failures': self.failures, 'opened': self.opened_count}
+
+
+class AdmissionController:
+    """Non-blocking cap on concurrent requests so overload is answered with a fast 503"""
+
+    def __init__(self, limit=MAX_INFLIGHT_REQUESTS):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'inFlight': self.in_flight, 'limit': self.limit, 'rejected': self.rejected}
+
+
+def backoff_delay(attempt, base=UPSTREAM_BACKOFF_BASE, cap=UPSTREAM_BACKOFF_MAX):
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def create_rate_limiter():
+    """Build the shared token bucket, or None when rate limiting is disabled"""
+    if not UPSTREAM_RATE_LIMIT_ENABLED:
+        return None
+    return TokenBucket()
+
+
+rate_limiter = create_rate_limiter()
+circuit_breaker = CircuitBreaker()
+admission = AdmissionController()
@@ -0,0 +1,114 @@
+import os
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Upstream connection settings (override through environment variables)
+UPSTREAM_POOL_CONNECTIONS = int(os.getenv('UPSTREAM_POOL_CONNECTIONS', '4'))
+# Connections kept per host. A gevent worker makes up to GUNICORN_WORKER_CONNECTIONS upstream calls at once
+# and urllib3 discards (then re-handshakes) every connection past the pool size, so the pool follows it;
+# a sync worker only has its one request plus the hedge and report job threads.
+_GEVENT = os.getenv('GUNICORN_WORKER_CLASS', 'gevent') == 'gevent'
+_WORKER_CONCURRENCY = os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000') if _GEVENT else '16'
+UPSTREAM_POOL_MAXSIZE = int(os.getenv('UPSTREAM_POOL_MAXSIZE', _WORKER_CONCURRENCY))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', '5'))
+UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', '30'))
+UPSTREAM_KEEPALIVE = os.getenv('UPSTREAM_KEEPALIVE', 'true').lower() == 'true'
+UPSTREAM_KEEPALIVE_IDLE = int(os.getenv('UPSTREAM_KEEPALIVE_IDLE', '60'))
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTP adapter that enables TCP keep-alive probes on pooled sockets"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        if UPSTREAM_KEEPALIVE:
+            socket_options = [
+                (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, UPSTREAM_KEEPALIVE_IDLE))
+            kwargs['socket_options'] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class UpstreamClient:
+    """Per-worker pooled HTTP client for the LLM provider"""
+
+    def __init__(self, pool_connections=None, pool_maxsize=None,
+                 connect_timeout=None, read_timeout=None):
+        self.pool_connections = pool_connections or UPSTREAM_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or UPSTREAM_POOL_MAXSIZE
+        self.timeout = (connect_timeout or UPSTREAM_CONNECT_TIMEOUT,
+                        read_timeout or UPSTREAM_READ_TIMEOUT)
+        self._lock = threading.Lock()
+        self._session = None
+        self._adapter = None
+        self._pid = None
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = KeepAliveAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not UPSTREAM_KEEPALIVE:
+            session.headers['Connection'] = 'close'
+        return session, adapter
+
+    @property
+    def session(self):
+        # Sockets must never be shared across a fork, so each worker process gets its own pool
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session, self._adapter = self._build_session()
+                    self._pid = os.getpid()
+        return self._session
+
+    def post(self, url, **kwargs):
+        """POST through the shared pool with split connect/read timeouts"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def pool_stats(self):
+        """Return connection pool usage for this worker"""
+        stats = {
+            'pid': os.getpid(),
+            'poolMaxsize': self.pool_maxsize,
+            'hosts': 0,
+            'requests': 0,
+            'connectionsOpened': 0,
+            'idleConnections': 0,
+            'connectionsReused': 0,
+        }
+        if self._adapter is None or self._pid != os.getpid():
+            return stats
+
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats['hosts'] += 1
+            stats['requests'] += pool.num_requests
+            stats['connectionsOpened'] += pool.num_connections
+            if pool.pool is not None:
+                stats['idleConnections'] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        stats['connectionsReused'] = max(0, stats['requests'] - stats['connectionsOpened'])
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+
+client = UpstreamClient()
@@ -0,0 +1,152 @@
+import os
+import threading
+
+import metrics
+
+# Request validation settings (override through environment variables)
+# Bodies over these sizes are refused from Content-Length, before anything is read or decoded
+MAX_CHAT_REQUEST_BYTES = int(os.getenv('MAX_CHAT_REQUEST_BYTES', str(256 * 1024)))
+MAX_BATCH_REQUEST_BYTES = int(os.getenv('MAX_BATCH_REQUEST_BYTES', str(16 * 1024 * 1024)))
+MAX_USER_MESSAGE_CHARS = int(os.getenv('MAX_USER_MESSAGE_CHARS', '4000'))
+MAX_HISTORY_MESSAGES = int(os.getenv('MAX_HISTORY_MESSAGES', '100'))
+MAX_HISTORY_MESSAGE_CHARS = int(os.getenv('MAX_HISTORY_MESSAGE_CHARS', '8000'))
+MAX_COURSE_CHARS = int(os.getenv('MAX_COURSE_CHARS', '120'))
+MAX_PROFILE_KEYS = int(os.getenv('MAX_PROFILE_KEYS', '50'))
+
+ASSESSMENT_PHASES = ('introduction', 'exploration', 'deep-dive', 'analysis', 'complete')
+MESSAGE_TYPES = ('user', 'ai')
+REPORT_CONVERSATION_MODES = ('full', 'reference', 'omit')
+
+# Requests refused by endpoint and reason since start-up
+rejection_stats = {}
+_stats_lock = threading.Lock()
+
+
+class ValidationError(ValueError):
+    """A rejected request payload; the message names the offending field"""
+
+    def __init__(self, path, message, reason='schema', status=400):
+        super().__init__(message)
+        self.path = path or ''
+        self.message = message
+        self.reason = reason
+        self.status = status
+
+    def within(self, key):
+        """Prefix the field path as the error propagates out of a container"""
+        separator = '' if not self.path or self.path.startswith('[') else '.'
+        self.path = f'{key}{separator}{self.path}'
+        return self
+
+    def __str__(self):
+        return f'{self.path}: {self.message}' if self.path else self.message
+
+
+def payload_too_large(limit):
+    return ValidationError(None, f'Request body must be at most {limit} bytes', reason='too_large', status=413)
+
+
+def count_rejection(endpoint, reason):
+    with _stats_lock:
+        key = f'{endpoint}:{reason}'
+        rejection_stats[key] = rejection_stats.get(key, 0) + 1
+    metrics.requests_rejected.inc(endpoint=endpoint, reason=reason)
+
+
+# Schemas are built from these combinators once at import. Each returns a
+# check(value) closure, so validating a request is plain function calls with
+# no schema interpretation; field paths are only built when a check fails.
+
+def string(max_chars, required=False, choices=None):
+    def check(value):
+        if not isinstance(value, str):
+            raise ValidationError(None, 'must be a string')
+        if required and not value.strip():
+            raise ValidationError(None, 'must not be empty')
+        if len(value) > max_chars:
+            raise ValidationError(None, f'must be at most {max_chars} characters')
+        if choices is not None and value not in choices:
+            raise ValidationError(None, f"must be one of {', '.join(choices)}")
+    check.required = required
+    return check
+
+
+def boolean():
+    def check(value):
+        if not isinstance(value, bool):
+            raise ValidationError(None, 'must be true or false')
+    check.required = False
+    return check
+
+
+def array(items, max_items, required=False):
+    def check(value):
+        if not isinstance(value, list):
+            raise ValidationError(None, 'must be a list')
+        if len(value) > max_items:
+            raise ValidationError(None, f'must have at most {max_items} items')
+        for index, item in enumerate(value):
+            try:
+                items(item)
+            except ValidationError as e:
+                raise e.within(f'[{index}]')
+    check.required = required
+    return check
+
+
+def mapping(max_keys, required=False):
+    """A free-form JSON object (its total size is bounded by the body limit)"""
+    def check(value):
+        if not isinstance(value, dict):
+            raise ValidationError(None, 'must be an object')
+        if len(value) > max_keys:
+            raise ValidationError(None, f'must have at most {max_keys} keys')
+    check.required = required
+    return check
+
+
+def record(fields, required=False):
+    """A JSON object with known fields; unknown fields are allowed and ignored"""
+    def check(value):
+        if not isinstance(value, dict):
+            raise ValidationError(None, 'must be a JSON object')
+        for name, field in fields.items():
+            field_value = value.get(name)
+            if field_value is None:
+                if field.required:
+                    raise ValidationError(name, 'is required')
+                continue
+            try:
+                field(field_value)
+            except ValidationError as e:
+                raise e.within(name)
+    check.required = required
+    return check
+
+
+def validate(schema, payload):
+    """Raise ValidationError unless payload matches schema"""
+    schema(payload)
+
+
+CONVERSATION_MESSAGE = record({
+    'type': string(8, required=True, choices=MESSAGE_TYPES),
+    'content': string(MAX_HISTORY_MESSAGE_CHARS),
+})
+
+CHAT_REQUEST = record({
+    'userMessage': string(MAX_USER_MESSAGE_CHARS, required=True),
+    'sessionId': string(64),
+    'course': string(MAX_COURSE_CHARS),
+    'assessmentPhase': string(16, choices=ASSESSMENT_PHASES),
+    'conversationHistory': array(CONVERSATION_MESSAGE, MAX_HISTORY_MESSAGES),
+    'userProfile': mapping(MAX_PROFILE_KEYS),
+    'asyncReport': boolean(),
+    'reportConversation': string(16, choices=REPORT_CONVERSATION_MODES),
+})
+
+BATCH_RECORD = record({
+    'course': string(MAX_COURSE_CHARS, required=True),
+    'conversationHistory': array(CONVERSATION_MESSAGE, MAX_HISTORY_MESSAGES),
+    'conversation': array(CONVERSATION_MESSAGE, MAX_HISTORY_MESSAGES),
+})
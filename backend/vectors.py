@@ -0,0 +1,113 @@
+import os
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# Conversation vector settings (override through environment variables)
+SEMANTIC_REUSE_DIMENSIONS = int(os.getenv('SEMANTIC_REUSE_DIMENSIONS', '2048'))
+SEMANTIC_REUSE_MAX_ENTRIES = int(os.getenv('SEMANTIC_REUSE_MAX_ENTRIES', '2000'))
+
+# Random-hyperplane LSH: a row is a candidate when it shares all BITS signs with the query in any table
+LSH_TABLES = 32
+LSH_BITS = 8
+LSH_SEED = 20240601
+
+_TOKEN = re.compile(r'[a-z0-9+#]+')
+STOPWORDS = frozenset((
+    'a', 'about', 'after', 'all', 'also', 'am', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'been', 'but', 'by',
+    'can', 'did', 'do', 'for', 'from', 'had', 'has', 'have', 'i', 'if', 'im', 'in', 'into', 'is', 'it', 'its',
+    'just', 'me', 'more', 'most', 'my', 'no', 'not', 'of', 'on', 'or', 'so', 'some', 'than', 'that', 'the',
+    'their', 'them', 'then', 'there', 'they', 'this', 'to', 'too', 'up', 'very', 'was', 'we', 'were', 'what',
+    'when', 'which', 'with', 'would', 'you', 'your',
+))
+
+
+def features(text):
+    """Content-word unigrams and bigrams of a text"""
+    tokens = [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+    return tokens + [f'{left} {right}' for left, right in zip(tokens, tokens[1:])]
+
+
+def hyperplanes(dimensions):
+    """LSH hyperplanes; the fixed seed makes every worker bucket a conversation the same way"""
+    return np.random.default_rng(LSH_SEED).standard_normal((LSH_TABLES * LSH_BITS, dimensions)).astype(np.float32)
+
+
+class HashedTfidf:
+    """TF-IDF vectors over hashed features, with document frequencies learned as documents arrive.
+
+    Stored vectors keep the IDF weights from when they were added; with a
+    course's vocabulary settling after a few dozen reports the drift is small.
+    """
+
+    def __init__(self, dimensions=SEMANTIC_REUSE_DIMENSIONS):
+        self.dimensions = dimensions
+        self.doc_freq = np.zeros(dimensions, dtype=np.float32)
+        self.documents = 0
+
+    def vector(self, text, learn=False):
+        """Unit-length TF-IDF vector of text as sparse (indices, weights), or None when it has no content words"""
+        indices = np.fromiter((zlib.crc32(feature.encode('utf-8')) % self.dimensions for feature in features(text)),
+                              dtype=np.int64)
+        if not indices.size:
+            return None
+        present, counts = np.unique(indices, return_counts=True)
+        if learn:
+            self.doc_freq[present] += 1
+            self.documents += 1
+        idf = np.log((1 + self.documents) / (1 + self.doc_freq[present])) + 1
+        weights = ((1 + np.log(counts)) * idf).astype(np.float32)
+        return present.astype(np.int32), weights / np.linalg.norm(weights)
+
+
+class CourseIndex:
+    """Past conversations of one course: a ring of sparse unit vectors plus LSH tables over them.
+
+    A conversation touches a few hundred of the hashed dimensions, so rows are
+    kept sparse and grow with the ring instead of being allocated up front.
+    """
+
+    def __init__(self, planes, capacity=SEMANTIC_REUSE_MAX_ENTRIES):
+        self.planes = planes
+        self.capacity = capacity
+        self.vectors = [None] * capacity
+        self.reports = [None] * capacity
+        self.keys = [None] * capacity
+        self.tables = [defaultdict(set) for _ in range(LSH_TABLES)]
+        self.added = 0
+
+    def _keys(self, vector):
+        indices, weights = vector
+        bits = (self.planes[:, indices] @ weights > 0).reshape(LSH_TABLES, LSH_BITS)
+        return bits.dot(1 << np.arange(LSH_BITS)).tolist()
+
+    def add(self, vector, report_blob):
+        row = self.added % self.capacity
+        if self.keys[row] is not None:
+            # The ring is full: the oldest report makes room
+            for table, key in zip(self.tables, self.keys[row]):
+                table[key].discard(row)
+        self.vectors[row] = vector
+        self.reports[row] = report_blob
+        self.keys[row] = self._keys(vector)
+        for table, key in zip(self.tables, self.keys[row]):
+            table[key].add(row)
+        self.added += 1
+
+    def nearest(self, vector):
+        """(similarity, report_blob) of the closest stored conversation among LSH candidates, or None"""
+        candidates = set()
+        for table, key in zip(self.tables, self._keys(vector)):
+            candidates.update(table.get(key, ()))
+        if not candidates:
+            return None
+        indices, weights = vector
+        query = np.zeros(self.planes.shape[1], dtype=np.float32)
+        query[indices] = weights
+        rows = list(candidates)
+        similarities = np.fromiter((query[self.vectors[row][0]] @ self.vectors[row][1] for row in rows),
+                                   dtype=np.float32, count=len(rows))
+        best = int(np.argmax(similarities))
+        return float(similarities[best]), self.reports[rows[best]]
@@ -4,10 +4,11 @@ import CourseInput from './components/CourseInput';
 import AIChat from './components/AIChat';
 import ChatResults from './components/ChatResults';
 import Footer from './components/Footer';
+import { API_ENDPOINTS, SESSION_STORAGE_KEY } from './config/api';
 
 export interface ChatAssessmentData {
   course: string;
-  conversation: any[];
+  conversation?: any[];
   assessmentType?: string;
   aiConfidence?: number;
   skillsAnalysis: {
@@ -44,6 +45,20 @@ function App() {
     });
   }, [currentState]);
 
+  // After a page refresh, reopen the report of the session this tab finished
+  useEffect(() => {
+    const sessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
+    if (!sessionId) return;
+    fetch(`${API_ENDPOINTS.sessionAssessment(sessionId)}?conversation=omit`)
+      .then(response => response.ok ? response.json() : null)
+      .then(data => {
+        if (!data?.assessment) return;
+        setChatAssessmentData(data.assessment);
+        setCurrentState('chat-results');
+      })
+      .catch(error => console.error('Error restoring assessment:', error));
+  }, []);
+
   const handleGetStarted = () => {
     setCurrentState('course-input');
   };
@@ -59,12 +74,14 @@ function App() {
   };
 
   const handleBackToHome = () => {
+    sessionStorage.removeItem(SESSION_STORAGE_KEY);
     setCurrentState('homepage');
     setSelectedCourse('');
     setChatAssessmentData(null);
   };
 
   const handleNewAssessment = () => {
+    sessionStorage.removeItem(SESSION_STORAGE_KEY);
     setCurrentState('course-input');
     setSelectedCourse('');
     setChatAssessmentData(null);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Send, Bot, User, Loader, MessageSquare, BookOpen, Target, ArrowLeft, RotateCcw, Download } from 'lucide-react';
-import { API_ENDPOINTS } from '../config/api';
+import { API_ENDPOINTS, SESSION_STORAGE_KEY } from '../config/api';
 
 interface Message {
   id: string;
@@ -19,7 +19,7 @@ interface AIChatProps {
 
 interface ChatAssessmentData {
   course: string;
-  conversation: Message[];
+  conversation?: Message[];
   assessmentType?: string;
   aiConfidence?: number;
   skillsAnalysis: {
@@ -40,12 +40,71 @@ interface ChatAssessmentData {
   confidence: number;
 }
 
+// Matches the server's MAX_USER_MESSAGE_CHARS default
+const MAX_USER_MESSAGE_CHARS = 4000;
+const REPORT_POLL_INTERVAL_MS = 2000;
+const REPORT_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+// Reports are generated as a background job on the server; poll it until it finishes
+const waitForAssessment = async (jobId: string): Promise<ChatAssessmentData> => {
+  const deadline = Date.now() + REPORT_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, REPORT_POLL_INTERVAL_MS));
+    let response: Response;
+    try {
+      response = await fetch(`${API_ENDPOINTS.assessmentJob(jobId)}?conversation=reference`);
+    } catch (error) {
+      console.warn(`Polling report job ${jobId} failed:`, error);
+      continue;
+    }
+    // Jobs are stored per server instance, so a poll routed to another instance gets a 404;
+    // keep polling (as for other transient errors) until one reaches the instance running the job
+    if (!response.ok) continue;
+    const job = await response.json();
+    if (job.status === 'completed' && job.assessment) return job.assessment;
+    if (job.status === 'failed') throw new Error(job.error || 'Report generation failed');
+  }
+  throw new Error('Report generation timed out');
+};
+
+// Reads the Server-Sent Events of /api/chat-assess/stream, passing each token to onToken, and
+// resolves with the payload of the final done event (the same body /api/chat-assess returns)
+const readChatStream = async (response: Response, onToken: (delta: string) => void) => {
+  if (!response.body) throw new Error('Chat stream has no body');
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === 'token') onToken(payload.delta);
+      else if (event === 'done') return payload;
+      else if (event === 'error') throw new Error(payload.error);
+    }
+  }
+  throw new Error('Chat stream ended before the reply was complete');
+};
+
 const AIChat: React.FC<AIChatProps> = ({ course, onAssessmentComplete, onBackToHome, onStartNewAssessment }) => {
   const [messages, setMessages] = useState<Message[]>([]);
   const [currentMessage, setCurrentMessage] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const [assessmentPhase, setAssessmentPhase] = useState<'introduction' | 'exploration' | 'deep-dive' | 'analysis' | 'complete'>('introduction');
   const [userProfile, setUserProfile] = useState<any>({});
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const [showLeaveConfirm, setShowLeaveConfirm] = useState(false);
   const [pendingNavigation, setPendingNavigation] = useState<'home' | 'new' | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
@@ -142,35 +201,67 @@ Let's start: What motivated you to study **${course}**, and what aspects of this
       isTyping: true
     };
     setMessages(prev => [...prev, typingMessage]);
+    const replyId = (Date.now() + 2).toString();
 
     try {
-      const response = await fetch(API_ENDPOINTS.chatAssess, {
+      // The reply is streamed, so the user reads it as it is generated rather than after the whole completion
+      const postChat = (payload: object) => fetch(API_ENDPOINTS.chatAssessStream, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({
-          course,
-          userMessage: currentMessage,
-          conversationHistory: messages,
-          assessmentPhase,
-          userProfile
-        }),
+        // The report is generated in the background (so the request cannot hit a proxy timeout) and
+        // would echo the conversation we already hold, so ask for a reference instead
+        body: JSON.stringify({ ...payload, asyncReport: true, reportConversation: 'reference' }),
       });
 
-      const data = await response.json();
+      const fullPayload = {
+        course,
+        userMessage: currentMessage,
+        conversationHistory: messages,
+        assessmentPhase,
+        userProfile
+      };
+
+      // Once the server holds the conversation, only the new message needs to be sent
+      let response = await postChat(sessionId ? { sessionId, userMessage: currentMessage } : fullPayload);
+      if (response.status === 404 && sessionId) {
+        // Server-side session expired: start a new one from the local history
+        response = await postChat(fullPayload);
+      }
+
+      if (!response.ok) {
+        // Rejected (400/413) or busy (503): the server's message says what to do
+        const rejection = await response.json().catch(() => ({}));
+        setMessages(prev => [...prev.filter(msg => !msg.isTyping), {
+          id: replyId,
+          type: 'ai',
+          content: rejection.error || 'I apologize, but I\'m having trouble connecting right now. Could you please try again?',
+          timestamp: new Date()
+        }]);
+        setIsLoading(false);
+        return;
+      }
 
-      // Remove typing indicator
-      setMessages(prev => prev.filter(msg => !msg.isTyping));
+      // The first token replaces the typing indicator and later ones extend the reply
+      const data = await readChatStream(response, delta => {
+        setMessages(prev => prev.some(msg => msg.id === replyId)
+          ? prev.map(msg => msg.id === replyId ? { ...msg, content: msg.content + delta } : msg)
+          : [...prev.filter(msg => !msg.isTyping), { id: replyId, type: 'ai', content: delta, timestamp: new Date() }]);
+      });
+      if (data.sessionId) {
+        setSessionId(data.sessionId);
+        sessionStorage.setItem(SESSION_STORAGE_KEY, data.sessionId);
+      }
 
       const aiResponse: Message = {
-        id: (Date.now() + 2).toString(),
+        id: replyId,
         type: 'ai',
         content: data.response,
         timestamp: new Date()
       };
 
-      setMessages(prev => [...prev, aiResponse]);
+      setMessages(prev => [...prev.filter(msg => !msg.isTyping && msg.id !== replyId), aiResponse]);
 
       // Update assessment state
       if (data.phase) setAssessmentPhase(data.phase);
@@ -181,15 +272,28 @@ Let's start: What motivated you to study **${course}**, and what aspects of this
         setTimeout(() => {
           onAssessmentComplete(data.assessment);
         }, 2000);
+      } else if (data.assessmentComplete && data.assessmentJobId) {
+        try {
+          onAssessmentComplete(await waitForAssessment(data.assessmentJobId));
+        } catch (error) {
+          console.error('Error generating report:', error);
+          const reportError: Message = {
+            id: (Date.now() + 3).toString(),
+            type: 'ai',
+            content: 'I couldn\'t finish your report just now. Please start a new assessment to try again.',
+            timestamp: new Date()
+          };
+          setMessages(prev => [...prev, reportError]);
+        }
       }
 
     } catch (error) {
       console.error('Error sending message:', error);
-      // Remove typing indicator
-      setMessages(prev => prev.filter(msg => !msg.isTyping));
+      // Remove typing indicator and any partly streamed reply
+      setMessages(prev => prev.filter(msg => !msg.isTyping && msg.id !== replyId));
       
       const errorMessage: Message = {
-        id: (Date.now() + 2).toString(),
+        id: (Date.now() + 3).toString(),
         type: 'ai',
         content: 'I apologize, but I\'m having trouble connecting right now. Could you please try again?',
         timestamp: new Date()
@@ -450,6 +554,7 @@ Generated by SkillBridge AI - Your Intelligent Career Companion`;
                     placeholder="Share your thoughts, experiences, or ask questions..."
                     className="w-full p-3 sm:p-4 border-2 border-slate-200 rounded-2xl resize-none focus:ring-2 focus:ring-emerald-500 focus:border-emerald-500 text-sm sm:text-base font-medium text-slate-800 placeholder-slate-500 bg-white shadow-sm"
                     rows={2}
+                    maxLength={MAX_USER_MESSAGE_CHARS}
                     disabled={isLoading}
                   />
                 </div>
@@ -2,7 +2,7 @@ import React, { useState } from 'react';
 
 interface ChatAssessmentData {
   course: string;
-  conversation: any[];
+  conversation?: any[];
   assessmentType?: string;
   skillsAnalysis: {
     currentSkills: string[];
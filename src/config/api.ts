@@ -14,6 +14,12 @@ export const API_BASE_URL = isDevelopment ? API_CONFIG.development.baseURL : API
 // API endpoints
 export const API_ENDPOINTS = {
   chatAssess: `${API_BASE_URL}/api/chat-assess`,
+  chatAssessStream: `${API_BASE_URL}/api/chat-assess/stream`,
+  sessionAssessment: (sessionId: string) => `${API_BASE_URL}/api/sessions/${sessionId}/assessment`,
+  assessmentJob: (jobId: string) => `${API_BASE_URL}/api/assessment-jobs/${jobId}`,
   health: `${API_BASE_URL}/api/health`,
   courses: `${API_BASE_URL}/api/courses`
 };
+
+// The current chat session, kept for the tab's lifetime so a finished report survives a page refresh
+export const SESSION_STORAGE_KEY = 'skillbridge.sessionId';